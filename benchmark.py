@@ -0,0 +1,176 @@
+import os
+import sys
+import json
+import time
+import timeit
+import random
+import argparse
+import platform
+import tempfile
+import contextlib
+
+from solver import ENGINES, LRUCache, LetterFrequencyAnalyzer, WordCorpus, WordFilter, WordleSolver
+
+SIZES = {"15k": None, "100k": 100_000, "1m": 1_000_000}
+
+# (known_pattern, unknowns, excluded_letters) for representative game states
+CONSTRAINT_SETS = {
+    "empty": ([None] * 5, [], []),
+    "green-heavy": (["s", None, "a", "r", None], [], []),
+    "yellow-heavy": ([None] * 5, [(0, "a"), (1, "e"), (2, "r"), (3, "t")], []),
+    "gray-heavy": ([None] * 5, [], list("bcdfghjkmpvwxz")),
+    "late-game": (["s", None, "a", None, None], [(0, "r"), (4, "t")], list("ceiouldnmph")),
+}
+
+
+def synthetic_words(base, size, seed=0):
+    """
+    Pad the real word list with random 5-letter strings up to the given size.
+
+    Letters are drawn with the real list's letter frequencies, so constraint
+    selectivity stays in a realistic range.
+    """
+    if size is None or size <= len(base):
+        return base
+    rng = random.Random(seed)
+    letters = "".join(base)
+    extra = ("".join(rng.choices(letters, k=5)) for _ in range(size - len(base)))
+    return base + tuple(extra)
+
+
+def load_fresh(path):
+    """Read a word file into a new WordCorpus, bypassing the per-process cache."""
+    with open(path, "r", encoding="utf-8") as f:
+        return WordCorpus((line.strip() for line in f if line.strip()), path)
+
+
+def quietly(func):
+    """Call func with its progress prints suppressed."""
+    with contextlib.redirect_stdout(None):
+        return func()
+
+
+def time_call(func, repeat=5):
+    """Return the best per-call time in seconds, timeit-style."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def run_suite(sizes, repeat=5):
+    """
+    Time the solver hot paths for every requested dictionary size.
+
+    Returns:
+        dict[str, float]: Seconds per call by benchmark name.
+    """
+    base = WordCorpus.load().words
+    results = {}
+
+    def record(name, func):
+        seconds = time_call(func, repeat)
+        results[name] = seconds
+        print(f"{name:<52}{seconds * 1e3:>12.4f} ms")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size_name in sizes:
+            words = synthetic_words(base, SIZES[size_name])
+            words_path = os.path.join(tmp, f"words-{size_name}.txt")
+            with open(words_path, "w", encoding="utf-8") as f:
+                f.write("\n".join(words) + "\n")
+
+            corpus = WordCorpus(words)
+            binary_path = os.path.join(tmp, f"words-{size_name}.bin")
+            corpus.save_binary(binary_path)
+            # Cold start: everything the solver needs, straight from the file
+            record(f"load_corpus[text,{size_name}]", lambda: load_fresh(words_path).masks)
+            record(f"load_corpus[binary,{size_name}]", lambda: WordCorpus.load_binary(binary_path).masks)
+
+            for engine in ENGINES:
+                # A zero-size cache, so repeated calls measure the engine itself
+                solver = WordleSolver(corpus, engine=engine, verbose=False, cache=LRUCache(0))
+                for case, clues in CONSTRAINT_SETS.items():
+                    record(f"filter_candidates[{engine},{size_name},{case}]", lambda: solver.filter_candidates(*clues))
+
+            # A fresh corpus per call, so the timing includes parsing the file
+            record(
+                f"analyze[{size_name}]",
+                lambda: LetterFrequencyAnalyzer(corpus=load_fresh(words_path)).analyze(verbose=False),
+            )
+            analyzer = LetterFrequencyAnalyzer(corpus=corpus)
+            analyzer.analyze(verbose=False)
+            record(f"suggest_best_words[{size_name}]", lambda: analyzer.suggest_best_words(words, top_n=26))
+
+            wf = WordFilter(words_path, os.path.join(tmp, "filtered.txt"))
+            # filter_and_save includes writing the binary copy
+            record(f"filter_and_save[{size_name}]", lambda: quietly(wf.filter_and_save))
+    return results
+
+
+def compare(results, baseline, tolerance, min_delta):
+    """
+    Compare results against a baseline.
+
+    A benchmark regresses when it is slower than baseline * (1 + tolerance)
+    and by more than min_delta seconds, which keeps timer noise on very fast
+    calls from failing the gate.
+
+    Returns:
+        list[str]: Names of the regressed benchmarks.
+    """
+    regressions = []
+    print(f"\n{'benchmark':<52}{'baseline ms':>12}{'now ms':>12}{'change':>9}")
+    for name, seconds in results.items():
+        before = baseline.get(name)
+        if before is None:
+            print(f"{name:<52}{'-':>12}{seconds * 1e3:>12.4f}{'new':>9}")
+            continue
+        change = seconds / before - 1
+        regressed = seconds > before * (1 + tolerance) and seconds - before > min_delta
+        flag = "  REGRESSED" if regressed else ""
+        print(f"{name:<52}{before * 1e3:>12.4f}{seconds * 1e3:>12.4f}{change:>+9.1%}{flag}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Microbenchmarks for the solver hot paths.")
+    parser.add_argument("--sizes", nargs="+", default=list(SIZES), choices=list(SIZES), help="dictionary sizes")
+    parser.add_argument("--repeat", type=int, default=5, help="timing repeats; the best one is kept")
+    parser.add_argument("--save", metavar="PATH", help="write the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="fail if slower than this JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown, 0.25 = 25%%")
+    parser.add_argument("--min-delta", type=float, default=50e-6, help="ignore slowdowns below this many seconds")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists("dict/words_filtered.txt"):
+        print("File dict/words_filtered.txt not found!")
+        return 1
+
+    results = run_suite(args.sizes, args.repeat)
+
+    if args.save:
+        data = {
+            "python": platform.python_version(),
+            "machine": platform.platform(),
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "results": results,
+        }
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        print(f"\nSaved baseline to {args.save}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance, args.min_delta)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed beyond {args.tolerance:.0%}")
+            return 1
+        print("\nNo regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
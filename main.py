@@ -1,3 +1,4 @@
+import startup
 import sys
 import time
 from solver import *
@@ -8,8 +9,6 @@ from tkinter import PhotoImage
 import ttkbootstrap as tb
 from ttkbootstrap.constants import *
 import threading
-from idlelib.tooltip import Hovertip
-import webbrowser
 
 APP_VERSION = "1.5.0"
 APP_NAME = "Wordle Solver"
@@ -83,10 +82,18 @@ class WordleSolverApp(tb.Window):
         self.deiconify()
         self.last_entry_value = ""
         self.is_dark_mode = False
+        self.corpus = None
         self.words = None
         self.analyzer = None
+        self.solver = None
+        self.session = None
+        self.ranker = None
+        # Held by query workers: the corpus, solver, session and their caches are shared
+        self.query_lock = threading.Lock()
 
         self.setup_layout()
+        # Runs once the event loop has drawn the window
+        self.after_idle(lambda: startup.mark("first window", report=True))
 
         # --- Lock Updater Control START ---
         self.lock_refresh_active = True
@@ -475,6 +482,8 @@ class WordleSolverApp(tb.Window):
         row += 1
 
         def open_wordle():
+            import webbrowser
+
             webbrowser.open_new("https://www.nytimes.com/games/wordle/")
 
         tb.Button(frame, text="🔗 Open Wordle", bootstyle="link", command=open_wordle).grid(
@@ -529,6 +538,54 @@ class WordleSolverApp(tb.Window):
         frame.columnconfigure(1, weight=0)
         top.deiconify()
 
+    def run_locked(self, func):
+        """
+        Run func on a background thread while holding the query lock.
+
+        Worker threads share the corpus, solver, session and their caches, so
+        they must not overlap; a click while one runs waits for it to finish.
+
+        :param func: The worker to run
+        """
+
+        def target():
+            with self.query_lock:
+                func()
+
+        threading.Thread(target=target, daemon=True).start()
+
+    def load_corpus(self):
+        """
+        Load the filtered dictionary and its letter frequencies once.
+
+        The WordCorpus is shared by the analyzer, the solver and the ranker, so
+        the word file is parsed a single time. Shows an error and returns False
+        if the file does not exist yet.
+
+        :return: True if the corpus is loaded
+        """
+        if self.corpus is not None:
+            return True
+
+        file_path = "dict/words_filtered.txt"
+        if not os.path.exists(file_path):
+            self.after(
+                0,
+                lambda: messagebox.showerror(
+                    "File Not Found", "words_filtered.txt not found!\nPlease click 'Get Dictionary' first."
+                ),
+            )
+            return False
+
+        with startup.phase("load corpus"):
+            corpus = WordCorpus.load(file_path)
+            self.words = corpus.words
+        with startup.phase("letter frequencies"):
+            self.analyzer = LetterFrequencyAnalyzer(corpus=corpus)
+            self.analyzer.analyze()
+        self.corpus = corpus
+        return True
+
     def best_words(self):
         """
         Calculate and display the best starting words based on letter frequency.
@@ -541,9 +598,8 @@ class WordleSolverApp(tb.Window):
         The function operates in a separate thread to avoid blocking the main
         application.
 
-        If the word list is not already loaded, it reads it from 'words_filtered.txt'.
-        If the letter frequency analyzer is not initialized, it creates and analyzes
-        it.
+        If the word list is not already loaded, it loads it from 'words_filtered.txt'
+        together with its letter frequencies (see load_corpus).
 
         The results are shown in a top-level window with two sections: one for
         letter frequencies and one for the best starting words based on frequency
@@ -551,22 +607,8 @@ class WordleSolverApp(tb.Window):
         """
 
         def worker():
-            if self.words is None:
-                file_path = "dict/words_filtered.txt"
-                if not os.path.exists(file_path):
-                    self.after(
-                        0,
-                        lambda: messagebox.showerror(
-                            "File Not Found", "words_filtered.txt not found!\nPlease click 'Get Dictionary' first."
-                        ),
-                    )
-                    return
-                with open(file_path, "r", encoding="utf-8") as f:
-                    self.words = tuple(line.strip() for line in f if line.strip())
-
-            if self.analyzer is None:
-                self.analyzer = LetterFrequencyAnalyzer()
-                self.analyzer.analyze()
+            if not self.load_corpus():
+                return
 
             letter_freqs = self.analyzer.frequencies.most_common()
             best_words = self.analyzer.suggest_best_words(self.words, top_n=26)
@@ -662,7 +704,7 @@ class WordleSolverApp(tb.Window):
                     ).grid(row=i, column=0, sticky="ew", padx=10, pady=2)
             top.deiconify()
 
-        threading.Thread(target=worker, daemon=True).start()
+        self.run_locked(worker)
 
     def donate(self):
         """
@@ -712,6 +754,8 @@ class WordleSolverApp(tb.Window):
         donate_button.image = donate_img
 
         def open_link(event):
+            import webbrowser
+
             webbrowser.open_new("http://www.coffeete.ir/Titan")
 
         donate_button.bind("<Button-1>", open_link)
@@ -744,6 +788,8 @@ class WordleSolverApp(tb.Window):
                 tooltip.hidetip()
                 tooltip = None
 
+            from idlelib.tooltip import Hovertip
+
             tooltip = Hovertip(copy_btn, "Copied to clipboard!")
             tooltip.showtip()
 
@@ -774,6 +820,13 @@ class WordleSolverApp(tb.Window):
         for entry in self.get_all_entries():
             entry.delete(0, END)
             entry.configure(style="Default.TEntry")
+
+        def reset_session():
+            if self.session is not None:
+                self.session.reset()
+
+        # Not while a query worker is updating the session
+        self.run_locked(reset_session)
         # Close previous result window if exists
         if hasattr(self, "result_window") and self.result_window is not None and self.result_window.winfo_exists():
             self.result_window.destroy()
@@ -1091,8 +1144,9 @@ class WordleSolverApp(tb.Window):
         """Downloads the Wordle dictionary and filters it to 5-letter words if not already done.
 
         This method checks if the Wordle dictionary already exists. If it does, it
-        asks the user if they want to re-download it. If yes, it downloads it and
-        filters it to 5-letter words. If no, it filters the existing dictionary
+        asks the user if they want to check for an update. If yes, it refreshes it
+        with a conditional download, which skips an unchanged dictionary, and
+        filters it again if it changed. If no, it filters the existing dictionary
         if it has not already been filtered. If the dictionary does not exist, it
         downloads it and filters it to 5-letter words.
 
@@ -1102,20 +1156,23 @@ class WordleSolverApp(tb.Window):
         def worker():
             dict_path = "dict/words.txt"
             filtered_path = "dict/words_filtered.txt"
-            dict_url = "https://github.com/TitanComputer/wordle-list/raw/refs/heads/main/words"
 
             if os.path.exists(dict_path):
                 result = messagebox.askyesno(
-                    "Dictionary Exists", "words.txt already exists.\nDo you want to re-download it?"
+                    "Dictionary Exists", "words.txt already exists.\nDo you want to check for an updated version?"
                 )
                 if result:
-                    downloader = DictionaryDownloader(dict_url)
-                    downloader.download()
-                    wf = WordFilter(dict_path, filtered_path)
-                    wf.filter_and_save()
-                    self.after(
-                        0, lambda: messagebox.showinfo("Done", "Dictionary downloaded and filtered successfully.")
-                    )
+                    status = DictionaryDownloader(DICT_URL).download()
+                    if status == "failed":
+                        self.after(0, lambda: messagebox.showerror("Error", "Could not download the dictionary."))
+                    elif status == "unchanged" and os.path.exists(filtered_path):
+                        self.after(0, lambda: messagebox.showinfo("Done", "Dictionary is already up to date."))
+                    else:
+                        wf = WordFilter(dict_path, filtered_path)
+                        wf.filter_and_save()
+                        self.after(
+                            0, lambda: messagebox.showinfo("Done", "Dictionary downloaded and filtered successfully.")
+                        )
                 else:
                     if not os.path.exists(filtered_path):
                         wf = WordFilter(dict_path, filtered_path)
@@ -1124,8 +1181,9 @@ class WordleSolverApp(tb.Window):
                     else:
                         self.after(0, lambda: messagebox.showinfo("Done", "Filtered dictionary already exists."))
             else:
-                downloader = DictionaryDownloader(dict_url)
-                downloader.download()
+                if DictionaryDownloader(DICT_URL).download() == "failed":
+                    self.after(0, lambda: messagebox.showerror("Error", "Could not download the dictionary."))
+                    return
                 wf = WordFilter(dict_path, filtered_path)
                 wf.filter_and_save()
                 self.after(0, lambda: messagebox.showinfo("Done", "Dictionary downloaded and filtered successfully."))
@@ -1142,26 +1200,12 @@ class WordleSolverApp(tb.Window):
         if there are any conflicts.
 
         The method runs in a separate thread to not block the main thread.
+        Queries run one at a time (see run_locked).
         """
 
         def worker():
-            if self.words is None:
-                file_path = "dict/words_filtered.txt"
-                if not os.path.exists(file_path):
-                    self.after(
-                        0,
-                        lambda: messagebox.showerror(
-                            "File Not Found", "words_filtered.txt not found!\nPlease click 'Get Dictionary' first."
-                        ),
-                    )
-                    return
-
-                with open(file_path, "r", encoding="utf-8") as f:
-                    self.words = tuple(line.strip() for line in f if line.strip())
-
-            if self.analyzer is None:
-                self.analyzer = LetterFrequencyAnalyzer()
-                self.analyzer.analyze()
+            if not self.load_corpus():
+                return
 
             if all(not entry.get().strip() for entry in self.get_all_entries()):
                 self.after(
@@ -1199,9 +1243,14 @@ class WordleSolverApp(tb.Window):
                 )
                 return
 
-            # Use solver
-            solver = WordleSolver(self.words)
-            candidates = solver.filter_candidates(known_pattern, unknowns, excluded_letters)
+            # Use solver (built once, so its per-word letter masks are reused).
+            # The session narrows the previous result while clues only tighten.
+            if self.solver is None:
+                with startup.phase("build solver"):
+                    self.solver = WordleSolver(self.corpus)
+                    self.session = SolverSession(self.solver, CandidateFrequencyAnalyzer(self.corpus))
+                    self.ranker = GuessRanker(self.corpus, analyzer=self.session.analyzer)
+            candidates = self.session.update(known_pattern, unknowns, excluded_letters)
 
             if len(candidates) == 0:
                 self.after(
@@ -1217,13 +1266,19 @@ class WordleSolverApp(tb.Window):
                     "For better results, please adjust your input constraints and try again.",
                 )
 
-            ranked_candidates = self.analyzer.suggest_best_words(word_list=candidates, top_n=300)
+            # Letter frequencies over the current candidates, not the whole dictionary
+            ranked_candidates = self.ranker.suggest_best_words(
+                candidates, strategy="frequency", guess_list=candidates, top_n=300
+            )
 
             self.after(0, lambda: self.show_results(ranked_candidates))
+            startup.mark("first query", report=True)
 
-        threading.Thread(target=worker, daemon=True).start()
+        self.run_locked(worker)
 
     def show_results(self, candidates):
+        from idlelib.tooltip import Hovertip
+
         if hasattr(self, "result_window") and self.result_window is not None and self.result_window.winfo_exists():
             self.result_window.destroy()
 
@@ -1361,5 +1416,6 @@ class WordleSolverApp(tb.Window):
 
 
 if __name__ == "__main__":
+    startup.mark("imports")
     app = WordleSolverApp()
     app.mainloop()
@@ -0,0 +1,482 @@
+import gc
+import os
+import sys
+import json
+import mmap
+import time
+import signal
+import socket
+import asyncio
+import argparse
+import contextlib
+import concurrent.futures
+from collections import deque
+from http import HTTPStatus
+
+import numpy as np
+
+from solver import QueryRunner, SCORERS, ENGINES, WordCorpus
+
+# Requests larger than this are rejected with 413
+MAX_BODY_BYTES = 1 << 20
+# Latency percentiles are taken over this many recent requests per route
+LATENCY_WINDOW = 4096
+# Idle keep-alive connections are closed after this many seconds
+IDLE_TIMEOUT = 30
+# A worker that dies sooner than this after starting is restarted with a
+# delay that doubles with every such failure, up to RESPAWN_MAX_DELAY seconds
+RESPAWN_MIN_UPTIME = 5
+RESPAWN_MAX_DELAY = 30
+# Routes with their own stats; anything else is counted as "other"
+ROUTES = ("/solve", "/health", "/metrics", "other")
+
+
+class LatencyStats:
+    def __init__(self, window=LATENCY_WINDOW):
+        """
+        Request counts and a sliding window of latencies for one route.
+
+        Parameters:
+            window (int): Number of recent latencies kept for the percentiles.
+        """
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.latencies = deque(maxlen=window)
+
+    def record(self, seconds, error=False):
+        self.count += 1
+        self.errors += error
+        self.total += seconds
+        self.latencies.append(seconds)
+
+    def summary(self):
+        """Return the counts and the mean, p50, p90, p99 and max latency in ms."""
+        ordered = sorted(self.latencies)
+        result = {"count": self.count, "errors": self.errors}
+        if ordered:
+            pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1e3
+            result.update(
+                mean_ms=self.total / self.count * 1e3,
+                p50_ms=pick(0.50),
+                p90_ms=pick(0.90),
+                p99_ms=pick(0.99),
+                max_ms=ordered[-1] * 1e3,
+            )
+        return result
+
+
+class SharedRouteTotals:
+    def __init__(self, slots):
+        """
+        Request totals of every pre-forked worker, so /metrics can report the
+        whole service rather than the one worker that answered.
+
+        The table lives in an anonymous shared mapping created before
+        forking. Each worker only writes its own slot (a restarted worker
+        takes over the slot of the one it replaces, keeping its totals), so
+        no locking is needed. Latency percentiles cannot be summed and stay
+        per worker (see LatencyStats).
+
+        Parameters:
+            slots (int): Number of workers.
+        """
+        self.slots = slots
+        # [slot, route] -> count, errors, total seconds, max seconds
+        self.buffer = mmap.mmap(-1, slots * len(ROUTES) * 4 * 8)
+        self.table = np.frombuffer(self.buffer, dtype=np.float64).reshape(slots, len(ROUTES), 4)
+        self.slot = None
+
+    def record(self, route, seconds, error=False):
+        """Add one request to this worker's slot (set self.slot after forking)."""
+        row = self.table[self.slot, ROUTES.index(route)]
+        row[0] += 1
+        row[1] += error
+        row[2] += seconds
+        row[3] = max(row[3], seconds)
+
+    def summary(self):
+        """Return the count, errors, mean and max latency in ms of every route, summed over the workers."""
+        counts, errors, total = self.table[:, :, :3].sum(axis=0).T
+        longest = self.table[:, :, 3].max(axis=0)
+        return {
+            route: {
+                "count": int(counts[i]),
+                "errors": int(errors[i]),
+                "mean_ms": total[i] / counts[i] * 1e3,
+                "max_ms": longest[i] * 1e3,
+            }
+            for i, route in enumerate(ROUTES)
+            if counts[i]
+        }
+
+
+class SolverService:
+    def __init__(self, runner, totals=None):
+        """
+        Answers solver requests from a corpus and index kept warm in memory.
+
+        Queries are solved on one executor thread, so the event loop stays
+        free to accept and read other requests while a ranking runs, and the
+        QueryRunner (whose caches are not thread-safe) is only touched by
+        one thread. Use --workers for more cores.
+
+        Parameters:
+            runner (QueryRunner): The warm solver to answer queries with.
+            totals (SharedRouteTotals, optional): Totals shared with the other
+                pre-forked workers, with self.slot set for this one.
+        """
+        self.runner = runner
+        self.totals = totals
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="solver")
+        self.started = time.time()
+        self.in_flight = 0
+        self.stats = {}
+
+    def solve(self, payload):
+        """Solve one query object or a list of them; runs on the executor thread."""
+        with contextlib.redirect_stdout(sys.stderr):
+            if isinstance(payload, list):
+                return [self.runner.solve(query) for query in payload]
+            return self.runner.solve(payload)
+
+    def metrics(self):
+        """
+        Uptime, requests in progress and the latency summary of every route,
+        for this process. With pre-forked workers, "all_workers" adds the
+        request totals of the whole service (see SharedRouteTotals).
+        """
+        result = {
+            "uptime_s": round(time.time() - self.started, 3),
+            "pid": os.getpid(),
+            "in_flight": self.in_flight,
+            "routes": {route: stats.summary() for route, stats in sorted(self.stats.items())},
+        }
+        if self.totals is not None:
+            result["all_workers"] = {"workers": self.totals.slots, "routes": self.totals.summary()}
+        return result
+
+    async def dispatch(self, method, path, body):
+        """
+        Route one request.
+
+        Returns:
+            tuple[HTTPStatus, object]: Status and JSON-serializable response body.
+        """
+        if path == "/solve":
+            if method != "POST":
+                return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Use POST"}
+            try:
+                payload = json.loads(body)
+            except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                return HTTPStatus.BAD_REQUEST, {"error": f"Invalid JSON: {e}"}
+            loop = asyncio.get_running_loop()
+            try:
+                result = await loop.run_in_executor(self.executor, self.solve, payload)
+            except Exception as e:
+                # A bug, not a bad query (those come back as {"error": ...})
+                print(f"Error solving {payload!r:.200}: {e!r}", file=sys.stderr)
+                return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"Internal error: {type(e).__name__}"}
+            failed = isinstance(result, dict) and "error" in result
+            return (HTTPStatus.BAD_REQUEST if failed else HTTPStatus.OK), result
+        if method != "GET":
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Use GET"}
+        if path == "/health":
+            return HTTPStatus.OK, {"status": "ok", "words": len(self.runner.corpus)}
+        if path == "/metrics":
+            return HTTPStatus.OK, self.metrics()
+        return HTTPStatus.NOT_FOUND, {"error": f"No route {path}"}
+
+    async def handle_connection(self, reader, writer):
+        """Serve HTTP/1.1 requests on one connection until it is closed."""
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(read_request(reader), IDLE_TIMEOUT)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                if request is None:
+                    break
+                start = time.perf_counter()
+                method, path, headers, body, error = request
+                self.in_flight += 1
+                try:
+                    if error is not None:
+                        status, result = error, {"error": error.phrase}
+                    else:
+                        status, result = await self.dispatch(method, path, body)
+                finally:
+                    self.in_flight -= 1
+
+                keep_alive = headers.get("connection", "").lower() != "close" and error is None
+                data = json.dumps(result, separators=(",", ":")).encode()
+                # Counted before the response goes out, so a client that got it sees it in /metrics
+                route = path if path in ROUTES else "other"
+                elapsed = time.perf_counter() - start
+                self.stats.setdefault(route, LatencyStats()).record(elapsed, error=status >= 400)
+                if self.totals is not None:
+                    self.totals.record(route, elapsed, error=status >= 400)
+                writer.write(
+                    f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode()
+                    + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+
+async def read_request(reader):
+    """
+    Read one HTTP/1.1 request.
+
+    Returns:
+        tuple | None: (method, path, headers, body, error), where error is an
+        HTTPStatus for a request that cannot be served, or None at end of stream.
+    """
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, _ = line.decode("latin-1").split()
+    except ValueError:
+        return "", "", {}, b"", HTTPStatus.BAD_REQUEST
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        return method, target, headers, b"", HTTPStatus.BAD_REQUEST
+    if length > MAX_BODY_BYTES:
+        return method, target, headers, b"", HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+    body = await reader.readexactly(length) if length else b""
+    return method, target.split("?", 1)[0], headers, body, None
+
+
+async def serve(service, host, port, sock=None):
+    """Run the server until cancelled; listens on sock if given, else on host:port."""
+    if sock is not None:
+        server = await asyncio.start_server(service.handle_connection, sock=sock)
+    else:
+        server = await asyncio.start_server(service.handle_connection, host, port)
+    addresses = ", ".join(str(s.getsockname()[:2]) for s in server.sockets)
+    print(f"Serving on {addresses} (pid {os.getpid()})", file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+
+def file_backed(array):
+    """Return True if the array's memory is a file mapping (shared by every process that maps it)."""
+    while array is not None:
+        if isinstance(array, mmap.mmap):
+            return True
+        # np.frombuffer over an mmap leaves a memoryview in the chain
+        array = array.obj if isinstance(array, memoryview) else getattr(array, "base", None)
+    return False
+
+
+def share_arrays(obj, names, blocks):
+    """
+    Move numpy array attributes of obj into shared memory.
+
+    Forked workers then map the same physical pages, with no per-worker
+    copy. Arrays that are already file-backed (a mapped .bin dictionary or
+    .npy matrix) are shared through the page cache and left as they are.
+
+    Parameters:
+        obj (object): Owner of the arrays, e.g. a WordCorpus.
+        names (Iterable[str]): Attribute names of the arrays.
+        blocks (list[SharedMemory]): Every new block is appended, so the
+            caller can unlink them on shutdown.
+
+    Returns:
+        int: Number of bytes moved into shared memory.
+    """
+    from multiprocessing import shared_memory
+
+    moved = 0
+    for name in names:
+        array = getattr(obj, name)
+        if file_backed(array) or array.nbytes == 0:
+            continue
+        block = shared_memory.SharedMemory(create=True, size=array.nbytes)
+        blocks.append(block)
+        shared = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+        shared[...] = array
+        shared.flags.writeable = False
+        setattr(obj, name, shared)
+        moved += array.nbytes
+    return moved
+
+
+def build_runner(dict_path, strategy, top_n, engine, matrix=False, blocks=None, rank_workers=1, book=None):
+    """
+    Load and warm a QueryRunner, placing its read-only arrays in shared memory
+    when blocks is given (see share_arrays).
+
+    Everything the first queries would compute lazily is computed here, so
+    forked workers inherit it instead of each building a private copy.
+    rank_workers is the runner's process pool size for bucket-based ranking;
+    the pool is started on first use, in the process that ranks. book is
+    the runner's opening book file (see QueryRunner), loaded here too.
+    """
+    corpus = WordCorpus.load(dict_path)
+    if blocks is not None:
+        # Shared before the solver components take references to them
+        share_arrays(corpus, ["letters", "mask_array", "presence", "counts"], blocks)
+    runner = QueryRunner(corpus, strategy, top_n, engine, rank_workers, book)
+    if matrix or SCORERS[strategy].needs_buckets:
+        loaded = runner.load_matrix()
+        if blocks is not None:
+            share_arrays(loaded, ["patterns"], blocks)
+    if book is not None:
+        runner.load_book()
+    runner.solve({"history": [["crane", "bybbg"]]})
+    # A pool started by the warm-up must not be inherited by forked workers
+    runner.close()
+    return runner
+
+
+def run_workers(runner, sock, workers):
+    """
+    Pre-fork workers that all accept on the same listening socket.
+
+    The parent only supervises: a worker that dies is replaced (with a
+    growing delay if workers keep dying right after start-up, see
+    RESPAWN_MIN_UPTIME), and on SIGINT/SIGTERM every worker is stopped.
+    """
+    # (start time, totals slot) of every live worker, by pid
+    children = {}
+    failures = 0
+    totals = SharedRouteTotals(workers)
+
+    def spawn(slot):
+        pid = os.fork()
+        if pid == 0:
+            totals.slot = slot
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.default_int_handler)
+            code = 0
+            try:
+                asyncio.run(serve(SolverService(runner, totals), None, None, sock=sock))
+            except KeyboardInterrupt:
+                pass
+            except BaseException:
+                code = 1
+            finally:
+                with contextlib.suppress(Exception):
+                    runner.close()
+                os._exit(code)
+        children[pid] = time.monotonic(), slot
+
+    def stop(signum, frame):
+        # Ignore further signals, so a second one cannot interrupt the shutdown
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    # Keep the garbage collector from touching (and so copying) the warm objects
+    gc.freeze()
+    for slot in range(workers):
+        spawn(slot)
+    try:
+        while children:
+            pid, status = os.wait()
+            child = children.pop(pid, None)
+            if child is None:
+                continue
+            started, slot = child
+            if time.monotonic() - started < RESPAWN_MIN_UPTIME:
+                failures += 1
+            else:
+                failures = 0
+            delay = min(RESPAWN_MAX_DELAY, 0.1 * 2**failures) if failures else 0
+            print(f"Worker {pid} exited with status {status}, restarting in {delay:.1f}s", file=sys.stderr)
+            time.sleep(delay)
+            spawn(slot)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for pid in children:
+            with contextlib.suppress(ProcessLookupError):
+                os.kill(pid, signal.SIGTERM)
+        for pid in children:
+            with contextlib.suppress(ChildProcessError):
+                os.waitpid(pid, 0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local HTTP/JSON solver service.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="port to listen on")
+    parser.add_argument("--dict", default="dict/words_filtered.txt", help="filtered dictionary file")
+    parser.add_argument("--strategy", default="frequency", choices=sorted(SCORERS), help="default ranking strategy")
+    parser.add_argument("--top", type=int, default=20, help="default number of ranked candidates")
+    parser.add_argument("--engine", default="index", choices=sorted(ENGINES), help="filtering engine")
+    parser.add_argument("--workers", type=int, default=1, help="pre-forked worker processes (needs os.fork)")
+    parser.add_argument("--matrix", action="store_true", help="load the feedback matrix at start-up")
+    parser.add_argument(
+        "--rank-workers", type=int, default=1, help="processes for bucket-based ranking (0 = every core)"
+    )
+    parser.add_argument("--book", action="store_true", help="answer history-only queries from the opening book")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.dict):
+        print(f"File {args.dict} not found! Run `python -m solver prepare` first.", file=sys.stderr)
+        return 1
+    if args.workers > 1 and not hasattr(os, "fork"):
+        print("--workers needs os.fork, which this platform does not have", file=sys.stderr)
+        return 1
+    book = os.path.join(os.path.dirname(args.dict), "book.pkl") if args.book else None
+    if book is not None and not SCORERS[args.strategy].needs_buckets:
+        print(f"--book needs a bucket-based --strategy, not {args.strategy}.", file=sys.stderr)
+        return 1
+
+    blocks = [] if args.workers > 1 else None
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            runner = build_runner(
+                args.dict, args.strategy, args.top, args.engine, args.matrix, blocks, args.rank_workers, book
+            )
+        if args.workers > 1:
+            shared = sum(block.size for block in blocks)
+            print(f"Shared {shared / 2**20:.1f} MiB of arrays with {args.workers} workers", file=sys.stderr)
+            sock = socket.create_server((args.host, args.port), backlog=1024)
+            with sock:
+                run_workers(runner, sock, args.workers)
+            return 0
+
+        service = SolverService(runner)
+        try:
+            asyncio.run(serve(service, args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            service.executor.shutdown(wait=False)
+            runner.close()
+        return 0
+    finally:
+        for block in blocks or []:
+            block.close()
+            block.unlink()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+import os
+import sys
+import time
+import argparse
+import random
+import concurrent.futures
+from collections import Counter
+
+from solver import (
+    SCORERS,
+    Constraints,
+    FeedbackMatrix,
+    GuessRanker,
+    LetterFrequencyAnalyzer,
+    OpeningBook,
+    SolverSession,
+    WordCorpus,
+    WordleSolver,
+    ALL_GREEN,
+    feedback_pattern,
+)
+
+MAX_GUESSES = 6
+# Games that have not been solved by now are abandoned and counted as failures
+MAX_TURNS = 20
+
+
+class SelfPlayer:
+    def __init__(self, words, strategy, matrix=None, analyzer=None, rank_workers=1):
+        """
+        Plays games against hidden answers with one guessing strategy.
+
+        Parameters:
+            words (WordCorpus): The dictionary; answers and guesses come from it.
+            strategy (str): A scorer name from SCORERS, or "book" to follow the
+                opening book.
+            matrix (FeedbackMatrix, optional): Needed by bucket-based scorers and "book".
+            analyzer (LetterFrequencyAnalyzer, optional): Needed by "frequency".
+            rank_workers (int | None): Processes for bucket counts, e.g. while
+                building a missing opening book (see BucketCounter).
+        """
+        self.words = words.words
+        self.strategy = strategy
+        self.solver = WordleSolver(words, verbose=False)
+        self.ranker = GuessRanker(words, analyzer=analyzer, matrix=matrix, workers=rank_workers)
+        self.book = OpeningBook.load(self.ranker) if strategy == "book" else None
+        # Candidate sets repeat across games (same opener, same feedback), so
+        # remember the guess picked for each one
+        self.memo = {}
+
+    def close(self):
+        """Shut down the ranker's worker processes, if any were started."""
+        self.ranker.close()
+
+    def next_guess(self, candidates, history):
+        """Pick the next guess for the given candidates and turns so far."""
+        if self.book is not None:
+            guess = self.book.next_guess(history)
+            if guess is not None:
+                return guess
+        if len(candidates) <= 2:
+            return candidates[0]
+
+        key = tuple(candidates)
+        guess = self.memo.get(key)
+        if guess is None:
+            strategy = "entropy" if self.book is not None else self.strategy
+            guess_list = None if SCORERS[strategy].needs_buckets else candidates
+            guess = self.ranker.suggest_best_words(candidates, strategy, guess_list, top_n=1)[0][0]
+            self.memo[key] = guess
+        return guess
+
+    def play(self, answer):
+        """
+        Play one game.
+
+        Returns:
+            int: The number of guesses it took, or MAX_TURNS + 1 if abandoned.
+        """
+        session = SolverSession(self.solver)
+        history = []
+        candidates = list(self.words)
+        for turn in range(1, MAX_TURNS + 1):
+            guess = self.next_guess(candidates, history)
+            code = feedback_pattern(guess, answer)
+            if code == ALL_GREEN:
+                return turn
+            history.append((guess, code))
+            candidates = session.update(*Constraints.from_history(history).clues())
+            # The clues cannot express letter counts, so drop the few survivors
+            # that would have produced different feedback
+            candidates = [w for w in candidates if all(feedback_pattern(g, w) == c for g, c in history)]
+        return MAX_TURNS + 1
+
+
+# SelfPlayer of a pool worker process, created once by _init_player
+_worker_player = None
+
+
+def _init_player(dict_path, strategy):
+    global _worker_player
+    _worker_player = _make_player(dict_path, strategy)
+
+
+def _play_chunk(answers):
+    return [_worker_player.play(answer) for answer in answers]
+
+
+def _make_player(dict_path, strategy, rank_workers=1):
+    corpus = WordCorpus.load(dict_path)
+    matrix = analyzer = None
+    if strategy == "book" or SCORERS[strategy].needs_buckets:
+        matrix = FeedbackMatrix.load(corpus, os.path.dirname(dict_path))
+    else:
+        analyzer = LetterFrequencyAnalyzer(corpus=corpus)
+        analyzer.analyze(verbose=False)
+    return SelfPlayer(corpus, strategy, matrix, analyzer, rank_workers)
+
+
+def run_strategy(dict_path, strategy, answers, workers=1):
+    """
+    Play every answer with one strategy, in parallel when workers > 1.
+
+    Returns:
+        dict: Summary with the guess-count distribution, mean, failure rate
+        (more than MAX_GUESSES guesses) and games per second.
+    """
+    if workers > 1 and strategy == "book":
+        # Build any missing matrix/book once here rather than in every worker,
+        # on as many processes as will play the games
+        _make_player(dict_path, strategy, rank_workers=workers).close()
+
+    start = time.perf_counter()
+    if workers <= 1:
+        player = _make_player(dict_path, strategy)
+        turns = [player.play(answer) for answer in answers]
+        player.close()
+    else:
+        chunk_size = max(1, len(answers) // (workers * 8))
+        chunks = [answers[i : i + chunk_size] for i in range(0, len(answers), chunk_size)]
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_player, initargs=(dict_path, strategy)
+        ) as executor:
+            turns = [t for chunk in executor.map(_play_chunk, chunks) for t in chunk]
+    elapsed = time.perf_counter() - start
+
+    return {
+        "strategy": strategy,
+        "games": len(turns),
+        "mean": sum(turns) / len(turns),
+        "distribution": dict(sorted(Counter(turns).items())),
+        "failure_rate": sum(t > MAX_GUESSES for t in turns) / len(turns),
+        "games_per_second": len(turns) / elapsed,
+    }
+
+
+def print_report(results):
+    """Print one row per strategy, best mean first."""
+    print(f"\n{'strategy':<12}{'games':>7}{'mean':>8}{'fail %':>8}{'games/s':>10}  distribution")
+    for r in sorted(results, key=lambda r: (r["failure_rate"], r["mean"])):
+        dist = " ".join(f"{turns}:{count}" for turns, count in r["distribution"].items())
+        print(
+            f"{r['strategy']:<12}{r['games']:>7}{r['mean']:>8.3f}{r['failure_rate'] * 100:>8.2f}"
+            f"{r['games_per_second']:>10.1f}  {dist}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Self-play every dictionary word against guessing strategies.")
+    parser.add_argument("--dict", default="dict/words_filtered.txt", help="filtered dictionary file")
+    parser.add_argument(
+        "--strategies",
+        nargs="+",
+        default=["frequency", "entropy"],
+        choices=sorted(SCORERS) + ["book"],
+        help="strategies to compare",
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="parallel game processes")
+    parser.add_argument("--limit", type=int, help="play a random sample of this many answers")
+    parser.add_argument("--seed", type=int, default=0, help="seed for --limit sampling")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.dict):
+        print(f"File {args.dict} not found!")
+        return 1
+    answers = list(WordCorpus.load(args.dict).words)
+    if args.limit:
+        answers = random.Random(args.seed).sample(answers, min(args.limit, len(answers)))
+
+    results = []
+    for strategy in args.strategies:
+        print(f"Playing {len(answers)} games with {strategy} ...")
+        results.append(run_strategy(args.dict, strategy, answers, args.workers))
+    print_report(results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,82 +1,1777 @@
+import io
 import os
-import requests
+import sys
 import re
-from collections import Counter
+import hashlib
+import pickle
+import mmap
+import struct
+import numbers
+import functools
+import contextlib
+import tempfile
+import time
+from collections import Counter, OrderedDict, namedtuple
+
+
+class LazyModule:
+    def __init__(self, name):
+        """
+        Stand-in for a module that is only imported on first attribute access.
+
+        Keeps heavy dependencies off the startup path: the GUI window and
+        the CLI come up before numpy is loaded, and processes that never
+        touch the arrays never pay for the import.
+
+        Parameters:
+            name (str): The dotted module name to import.
+        """
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            # __import__ rather than importlib, so the start-up import hook sees it
+            __import__(self._name)
+            self._module = sys.modules[self._name]
+        return getattr(self._module, attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<LazyModule {self._name!r} ({state})>"
+
+
+# Loaded by name, which import tracing cannot see: frozen builds must include
+# numpy explicitly (the Nuitka build passes --include-module=numpy)
+np = LazyModule("numpy")
+
+# Feedback patterns are base-3 codes: digit i is 0 (gray), 1 (yellow) or 2 (green)
+# for position i, so every pattern fits in a uint8 (0-242)
+PATTERN_COUNT = 3**5
+ALL_GREEN = PATTERN_COUNT - 1
+
+
+def letter_mask(word):
+    """
+    Encode the set of letters in a word as a 26-bit integer.
+
+    Bit 0 stands for 'a', bit 25 for 'z'. Repeated letters set the same bit,
+    so the mask only records which letters are present, not how often.
+
+    Parameters:
+        word (Iterable[str]): Lowercase letters a-z.
+
+    Returns:
+        int: The letter-set mask.
+    """
+    mask = 0
+    for ch in word:
+        mask |= 1 << (ord(ch) - 97)
+    return mask
+
+
+def open_compressed(path, mode="rb", compressed=None, level=3, zstd_dict=None):
+    """
+    Open a file, transparently zstd-(de)compressing it as a stream.
+
+    Parameters:
+        path (str): File to open.
+        mode (str): "rb", "wb", "rt" or "wt"; text modes use UTF-8.
+        compressed (bool, optional): Use zstd; by default when path ends in ".zst".
+        level (int): zstd compression level for writing.
+        zstd_dict (bytes, optional): Trained zstd dictionary (see train_zstd_dict);
+            the same one must be given for reading and writing.
+
+    Returns:
+        A file object; close it (or use it in a with block) to finish the stream.
+    """
+    if compressed is None:
+        compressed = path.endswith(".zst")
+    if not compressed:
+        return open(path, mode, encoding=None if "b" in mode else "utf-8")
+
+    import zstandard
+
+    dict_data = zstandard.ZstdCompressionDict(zstd_dict) if zstd_dict else None
+    raw = open(path, "rb" if "r" in mode else "wb")
+    if "r" in mode:
+        stream = zstandard.ZstdDecompressor(dict_data=dict_data).stream_reader(raw, closefd=True)
+    else:
+        stream = zstandard.ZstdCompressor(level=level, dict_data=dict_data).stream_writer(raw, closefd=True)
+    return stream if "b" in mode else io.TextIOWrapper(stream, encoding="utf-8")
+
+
+def train_zstd_dict(paths, dict_size=16 * 1024, sample_size=4096):
+    """
+    Train a zstd dictionary from sample files, e.g. earlier word lists.
+
+    Each file is cut into sample_size chunks to serve as training samples.
+
+    Returns:
+        bytes: The dictionary, to be saved and passed as zstd_dict.
+    """
+    import zstandard
+
+    samples = []
+    for path in paths:
+        with open_compressed(path, "rb") as f:
+            data = f.read()
+        samples.extend(data[i : i + sample_size] for i in range(0, len(data), sample_size))
+    return zstandard.train_dictionary(dict_size, samples).as_bytes()
+
+
+def strip_zst(path):
+    """Return path without a trailing ".zst"."""
+    return path[:-4] if path.endswith(".zst") else path
 
 
 class DictionaryDownloader:
-    def __init__(self, url: str, save_dir: str = "dict", filename: str = "words.txt"):
+    def __init__(
+        self,
+        url: str,
+        save_dir: str = "dict",
+        filename: str = "words.txt",
+        compress=False,
+        zstd_dict=None,
+        timeout=(10, 60),
+        session=None,
+        chunk_size=1 << 14,
+    ):
+        """
+        Parameters:
+            url (str): Where to download the dictionary from.
+            save_dir (str): Directory to save it in.
+            filename (str): File name to save it under.
+            compress (bool): Store it zstd-compressed as <filename>.zst.
+            zstd_dict (bytes, optional): Trained zstd dictionary for compression.
+            timeout (float | tuple): Connect and read timeouts in seconds.
+            session (requests.Session, optional): Session to reuse connections
+                from; one is created on first use if None.
+            chunk_size (int): Bytes written per chunk while streaming; a dropped
+                connection loses at most the chunk being read.
+        """
         self.url = url
         self.save_dir = save_dir
-        self.filename = filename
+        # Compressed downloads are stored as <filename>.zst
+        self.filename = filename + ".zst" if compress and not filename.endswith(".zst") else filename
+        self.zstd_dict = zstd_dict
+        self.timeout = timeout
+        self.session = session
+        self.chunk_size = chunk_size
         os.makedirs(self.save_dir, exist_ok=True)
+        self.save_path = os.path.join(self.save_dir, self.filename)
+        # Raw bytes of an unfinished download, and the validators of both files
+        self.part_path = strip_zst(self.save_path) + ".part"
+        self.meta_path = self.save_path + ".meta"
+
+    def download(self, force=False):
+        """Download the dictionary from the given url and save it to
+        the given directory under the given filename.
+
+        The response is streamed to a .part file that replaces the saved file
+        only once it is complete. The ETag / Last-Modified validators are kept
+        in a .meta file next to it, so a refresh is a conditional GET that
+        skips an unchanged dictionary. An interrupted download resumes with a
+        Range request if the server still has the same version.
+
+        Prints a message on success or failure.
+
+        Parameters:
+            force (bool): Download even if the saved file is up to date.
+
+        Returns:
+            str: "downloaded", "unchanged" (the server answered 304 Not
+            Modified) or "failed".
+        """
+        # Only needed here, so importing solver does not pull in the HTTP stack
+        import requests
+
+        if self.session is None:
+            self.session = requests.Session()
+        meta = self._load_meta()
+        # Byte offsets must match the raw file, so no transfer compression
+        headers = {"Accept-Encoding": "identity"}
+
+        offset = os.path.getsize(self.part_path) if os.path.exists(self.part_path) else 0
+        partial = meta.get("partial") or {}
+        if offset and (partial.get("etag") or partial.get("last_modified")):
+            headers["Range"] = f"bytes={offset}-"
+            headers["If-Range"] = partial.get("etag") or partial["last_modified"]
+        else:
+            offset = 0
+            if not force and os.path.exists(self.save_path):
+                if meta.get("etag"):
+                    headers["If-None-Match"] = meta["etag"]
+                if meta.get("last_modified"):
+                    headers["If-Modified-Since"] = meta["last_modified"]
+
+        try:
+            print(f"Downloading dictionary from {self.url} ...")
+            with self.session.get(self.url, headers=headers, stream=True, timeout=self.timeout) as response:
+                if response.status_code == 304:
+                    print(f"Dictionary {self.save_path} is up to date")
+                    return "unchanged"
+                if response.status_code == 416:
+                    # The partial file does not fit the current version; start over
+                    os.remove(self.part_path)
+                    meta.pop("partial", None)
+                    self._save_meta(meta)
+                    return self.download(force=True)
+                response.raise_for_status()
+
+                resumed = response.status_code == 206
+                if resumed:
+                    print(f"Resuming at byte {offset:,}")
+                else:
+                    offset = 0
+                validators = {
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                }
+                meta["partial"] = validators
+                self._save_meta(meta)
+                expected = self._expected_size(response, offset)
+
+                with open(self.part_path, "ab" if resumed else "wb") as f:
+                    for chunk in response.iter_content(self.chunk_size):
+                        f.write(chunk)
+                    size = f.tell()
+            if expected is not None and size != expected:
+                raise requests.RequestException(f"incomplete download, got {size} of {expected} bytes")
+
+            self._finish()
+            meta = {"url": self.url, **validators, "size": size}
+            self._save_meta(meta)
+            print(f"Saved dictionary to {self.save_path}")
+            return "downloaded"
+        except (requests.RequestException, OSError) as e:
+            print(f"Error downloading file: {e}")
+            return "failed"
+
+    @staticmethod
+    def _expected_size(response, offset):
+        """Total size of the complete file, from Content-Range or Content-Length."""
+        content_range = response.headers.get("Content-Range", "")
+        if response.status_code == 206 and "/" in content_range:
+            total = content_range.rsplit("/", 1)[1]
+            return int(total) if total.isdigit() else None
+        length = response.headers.get("Content-Length")
+        return offset + int(length) if length and length.isdigit() else None
+
+    def _finish(self):
+        """Move the completed .part file into place, compressing it if needed."""
+        if self.save_path.endswith(".zst"):
+            tmp_path = self.save_path + ".tmp"
+            with open(self.part_path, "rb") as src, open_compressed(
+                tmp_path, "wb", compressed=True, zstd_dict=self.zstd_dict
+            ) as dst:
+                while True:
+                    block = src.read(1 << 20)
+                    if not block:
+                        break
+                    dst.write(block)
+            os.replace(tmp_path, self.save_path)
+            os.remove(self.part_path)
+        else:
+            os.replace(self.part_path, self.save_path)
+
+    def _load_meta(self):
+        """Saved validators for self.url, or an empty dict."""
+        import json
+
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return meta if isinstance(meta, dict) and meta.get("url") == self.url else {}
+
+    def _save_meta(self, meta):
+        import json
+
+        meta["url"] = self.url
+        tmp_path = self.meta_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp_path, self.meta_path)
+
+
+# Every 5-letter word maps to the index sum(code * 26**(4 - pos)), letter
+# codes 0-25; index order is alphabetical order
+WORD_SPACE = 26**5
+WORD_PLACES = (26**4, 26**3, 26**2, 26, 1)
+
+
+class WordFilter:
+    def __init__(
+        self, input_path="dict/words.txt", output_path="dict/words_filtered.txt", binary_path=None, zstd_dict=None
+    ):
+        """
+        Paths ending in ".zst" are read and written zstd-compressed (see
+        open_compressed), using zstd_dict if given.
+        """
+        self.input_path = input_path
+        self.output_path = output_path
+        # Compact binary copy for fast startup (see WordCorpus.save_binary)
+        self.binary_path = binary_path or os.path.splitext(strip_zst(output_path))[0] + ".bin"
+        self.zstd_dict = zstd_dict
+        # One match per line holding exactly five letters (lowercased
+        # beforehand), surrounded by any ASCII whitespace str.strip() removes
+        self.pattern = re.compile(rb"^[ \t\v\f\x1c-\x1f]*([a-z]{5})[ \t\v\f\x1c-\x1f]*$", re.MULTILINE)
+        # Lines with non-ASCII bytes; rare, so they are decoded and checked one by one
+        self.non_ascii = re.compile(rb"^.*[\x80-\xff].*$", re.MULTILINE)
+        self.word = re.compile(r"[a-z]{5}")
+
+    def filter_and_save(self, chunk_size=1 << 20):
+        """
+        Filters a list of words from the input file, keeping only those that match
+        the specified pattern (5-letter lowercase words), and saves the filtered
+        list in sorted order to the output file. If the input file is not found,
+        prints a message and exits.
+
+        The function ensures that the words are unique and sorted alphabetically
+        before writing them to the output file. The same list is also written
+        to self.binary_path in the memory-mappable binary format.
+
+        The input is streamed in chunks and memory stays bounded for source
+        files of any size: there are only 26**5 possible words, so a fixed
+        table with one flag per word index (see WORD_SPACE) both
+        deduplicates and sorts them, with no set and no external sort.
+
+        Prints the number of words saved to the output file and the throughput.
+
+        Parameters:
+            chunk_size (int): Bytes read from the input at a time.
+
+        :raises FileNotFoundError: if the input file does not exist.
+        """
+
+        if not os.path.exists(self.input_path):
+            print(f"File {self.input_path} not found!")
+            return
+
+        start = time.perf_counter()
+        lines = 0
+        seen = np.zeros(WORD_SPACE, dtype=bool)
+        for found, count in self._read_chunks(chunk_size):
+            lines += count
+            if found:
+                letters = np.frombuffer(b"".join(found), dtype=np.uint8).reshape(-1, 5) - 97
+                seen[letters.astype(np.int64) @ WORD_PLACES] = True
+
+        self._write(np.flatnonzero(seen))
+        elapsed = time.perf_counter() - start
+        print(f"Read {lines:,} lines in {elapsed:.2f}s ({lines / max(elapsed, 1e-9):,.0f} lines/s)")
+
+    def _read_chunks(self, chunk_size):
+        """
+        Yield (matched words, number of lines) for each chunk of the input.
+
+        Lines end in "\n", "\r\n" or "\r", and each line is accepted exactly
+        when line.strip().lower() of the UTF-8 text is five letters a-z.
+        """
+        with open_compressed(self.input_path, "rb", zstd_dict=self.zstd_dict) as infile:
+            tail = b""
+            while True:
+                block = infile.read(chunk_size)
+                if not block:
+                    break
+                block = tail + block
+                # A final "\r" may be the first half of "\r\n"; keep it for the next chunk
+                held = b"\r" if block.endswith(b"\r") else b""
+                block = block[: len(block) - len(held)].replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+                # Carry the unfinished last line over to the next chunk
+                cut = block.rfind(b"\n") + 1
+                tail = block[cut:] + held
+                block = block[:cut]
+                yield self._scan(block), block.count(b"\n")
+            if tail:
+                yield self._scan(tail.replace(b"\r\n", b"\n").replace(b"\r", b"\n")), 1
+
+    def _scan(self, block):
+        """Return the five-letter words (as lowercase bytes) on the lines of block."""
+        block = block.lower()
+        found = self.pattern.findall(block)
+        if not block.isascii():
+            # Unicode whitespace (e.g. NBSP) or letters that lowercase to ASCII
+            for line in self.non_ascii.findall(block):
+                word = line.decode("utf-8", "replace").strip().lower()
+                if self.word.fullmatch(word):
+                    found.append(word.encode("ascii"))
+        return found
+
+    def _write(self, indices, batch_size=1 << 16):
+        """
+        Write the words with the given sorted indices (see WORD_SPACE) to the
+        output and binary files in large batches.
+
+        The text output is replaced atomically. The binary copy is optional:
+        if it cannot be written, loading falls back to the text file.
+        """
+        try:
+            binary = BinaryDictionaryWriter(self.binary_path, zstd_dict=self.zstd_dict)
+        except OSError as e:
+            print(f"Could not write binary dictionary: {e}")
+            binary = None
+
+        tmp_path = self.output_path + ".tmp"
+        compressed = self.output_path.endswith(".zst")
+        try:
+            with open_compressed(tmp_path, "wb", compressed=compressed, zstd_dict=self.zstd_dict) as outfile:
+                for start in range(0, len(indices), batch_size):
+                    batch = indices[start : start + batch_size]
+                    letters = (batch[:, None] // WORD_PLACES % 26).astype(np.uint8)
+                    lines = np.empty((len(batch), 6), dtype=np.uint8)
+                    lines[:, :5] = letters + 97
+                    lines[:, 5] = 10
+                    outfile.write(lines.tobytes())
+                    if binary is not None:
+                        binary.write(letters)
+            os.replace(tmp_path, self.output_path)
+            print(f"Filtered words saved to {self.output_path}, total {len(indices)} words.")
+        except BaseException:
+            if binary is not None:
+                binary.abort()
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+            raise
+
+        if binary is not None:
+            try:
+                binary.close(source=self.output_path)
+                print(f"Binary dictionary saved to {self.binary_path}")
+            except OSError as e:
+                binary.abort()
+                print(f"Could not write binary dictionary: {e}")
+
+
+def encode_words(words):
+    """
+    Convert words to an (N, 5) uint8 array of letter codes (0 for 'a' ... 25 for 'z').
+
+    Parameters:
+        words (Sequence[str]): 5-letter lowercase words.
+
+    Returns:
+        numpy.ndarray: The letter codes.
+    """
+    codes = np.frombuffer("".join(words).encode("ascii"), dtype=np.uint8)
+    return (codes - 97).reshape(len(words), 5)
+
+
+def letter_presence(words):
+    """
+    Build an (N, 26) int64 matrix with a 1 where a word contains a letter.
+
+    Repeated letters count once, matching how LetterFrequencyAnalyzer scores.
+
+    Parameters:
+        words (Sequence[str]): Lowercase a-z words; 5-letter words take the
+            vectorized path, other lengths are handled word by word.
+
+    Returns:
+        numpy.ndarray: The presence matrix.
+    """
+    presence = np.zeros((len(words), 26), dtype=np.int64)
+    try:
+        letters = encode_words(words)
+    except ValueError:
+        for i, word in enumerate(words):
+            for ch in set(word):
+                presence[i, ord(ch) - 97] = 1
+        return presence
+    presence[np.arange(len(words))[:, None], letters] = 1
+    return presence
+
+
+def select_top(keys, top_n):
+    """
+    Indices of the top_n best rows, like np.lexsort(keys)[:top_n] without the full sort.
+
+    keys follow np.lexsort: the last key is the primary one and smaller sorts
+    first. Only rows tied with or better than the top_n-th primary value are
+    sorted, so the cost stays linear in the number of rows.
+
+    Parameters:
+        keys (list[numpy.ndarray]): Sort keys, least significant first.
+        top_n (int): Number of rows to return.
+
+    Returns:
+        numpy.ndarray: Row indices, best first.
+    """
+    primary = keys[-1]
+    if top_n <= 0:
+        return np.empty(0, dtype=np.intp)
+    if top_n < len(primary):
+        kth = np.partition(primary, top_n - 1)[top_n - 1]
+        rows = np.flatnonzero(primary <= kth)
+    else:
+        rows = np.arange(len(primary))
+    return rows[np.lexsort([key[rows] for key in keys])][:top_n]
+
+
+def positional_counts(letters, ids=None):
+    """
+    Count every letter at every position in one bincount pass.
+
+    Parameters:
+        letters (numpy.ndarray): (N, 5) letter codes (see encode_words).
+        ids (Sequence[int], optional): Rows to count; all rows if None.
+
+    Returns:
+        numpy.ndarray: (5, 26) int64 counts, [position, letter].
+    """
+    rows = letters if ids is None else letters[np.asarray(ids, dtype=np.intp)]
+    cells = rows + np.arange(5, dtype=np.intp) * 26
+    return np.bincount(cells.ravel(), minlength=5 * 26).reshape(5, 26)
+
+
+def positional_scores(letters, presence, count_ids=None, score_ids=None, global_weight=0.5):
+    """
+    Score words by how common their letters are at their positions and overall.
+
+    Both parts are fractions of the counted words, so they mix on the same
+    scale: the positional part sums, per position, the share of words with the
+    same letter there; the global part sums the share containing each of the
+    word's distinct letters.
+
+    Parameters:
+        letters (numpy.ndarray): (N, 5) letter codes of the dictionary.
+        presence (numpy.ndarray): (N, 26) letter presence (see letter_presence).
+        count_ids (Sequence[int], optional): Words the frequencies are taken over.
+        score_ids (Sequence[int], optional): Words to score.
+        global_weight (float): Weight of the global part, 0 to 1.
+
+    Returns:
+        numpy.ndarray: One float score per scored word.
+    """
+    if count_ids is None:
+        count_ids = np.arange(len(letters))
+    if score_ids is None:
+        score_ids = np.arange(len(letters))
+    count_ids = np.asarray(count_ids, dtype=np.intp)
+    score_ids = np.asarray(score_ids, dtype=np.intp)
+    total = max(1, len(count_ids))
+
+    positional = positional_counts(letters, count_ids) / total
+    overall = presence[count_ids].sum(axis=0) / total
+    scored = letters[score_ids]
+    by_position = positional[np.arange(5), scored].sum(axis=1)
+    by_letter = presence[score_ids] @ overall
+    return (1 - global_weight) * by_position + global_weight * by_letter
+
+
+def words_hash(words):
+    """Return a short hex digest identifying a word list, used to version derived files."""
+    return hashlib.sha1("\n".join(words).encode("ascii")).hexdigest()[:16]
+
+
+def feedback_pattern(guess, answer):
+    """
+    Compute the Wordle feedback for a guess against a hidden answer.
+
+    Greens are assigned first; each remaining guess letter is yellow only
+    while unmatched copies of it are left in the answer, so repeated letters
+    behave like in the real game.
+
+    Parameters:
+        guess (str): The guessed word.
+        answer (str): The hidden word.
+
+    Returns:
+        int: The pattern code (see PATTERN_COUNT).
+    """
+    code = 0
+    remaining = Counter(a for g, a in zip(guess, answer) if g != a)
+    for i, (g, a) in enumerate(zip(guess, answer)):
+        if g == a:
+            code += 2 * 3**i
+        elif remaining[g] > 0:
+            remaining[g] -= 1
+            code += 3**i
+    return code
+
+
+# Binary dictionary layout (little-endian): header, then N 5-byte letter-code
+# records, zero padding to a 4-byte boundary, then N uint32 letter masks.
+# The header ends with the size and mtime (ns) of the text file the binary is
+# a copy of, or zeros if it has none.
+BINARY_MAGIC = b"WRDL"
+BINARY_FORMAT = 2
+BINARY_HEADER = struct.Struct("<4sHHI16sQq")
+
+
+class BinaryDictionaryWriter:
+    def __init__(self, path, zstd_dict=None):
+        """
+        Write the binary dictionary format incrementally, in sorted batches, so
+        a list far larger than a WordCorpus would comfortably hold can be saved.
+
+        The count and the version hash in the header are only known at the
+        end, so records go to a temporary file and the header is written on
+        close(). The masks are spooled to a second temporary file. The target
+        is replaced atomically; a path ending in ".zst" is compressed.
+
+        Parameters:
+            path (str): The binary dictionary to write.
+            zstd_dict (bytes, optional): Trained zstd dictionary for a ".zst" path.
+        """
+        self.path = path
+        self.zstd_dict = zstd_dict
+        self.tmp_path = strip_zst(path) + ".tmp"
+        self.count = 0
+        self.digest = hashlib.sha1()
+        self.records = open(self.tmp_path, "wb")
+        self.records.write(b"\0" * BINARY_HEADER.size)
+        self.masks = tempfile.TemporaryFile()
+
+    def write(self, letters):
+        """
+        Append words given as an (N, 5) uint8 array of letter codes (see encode_words).
+        """
+        if not len(letters):
+            return
+        letters = np.ascontiguousarray(letters, dtype=np.uint8)
+        self.records.write(letters.tobytes())
+        bits = np.left_shift(np.uint32(1), letters.astype(np.uint32))
+        self.masks.write(np.bitwise_or.reduce(bits, axis=1).astype("<u4").tobytes())
+        # Same digest as words_hash: the words joined by newlines
+        text = np.empty((len(letters), 6), dtype=np.uint8)
+        text[:, :5] = letters + 97
+        text[:, 5] = 10
+        if self.count:
+            self.digest.update(b"\n")
+        self.digest.update(text.tobytes()[:-1])
+        self.count += len(letters)
+
+    def close(self, source=None):
+        """
+        Finish the file and move it into place.
+
+        Parameters:
+            source (str, optional): Text word file holding the same list; its
+                size and mtime are recorded so WordCorpus.load can tell whether
+                the binary copy is still current.
+        """
+        source_size = source_mtime = 0
+        if source is not None:
+            stat = os.stat(source)
+            source_size, source_mtime = stat.st_size, stat.st_mtime_ns
+        records = self.records
+        records.write(b"\0" * (-(BINARY_HEADER.size + self.count * 5) % 4))
+        self.masks.seek(0)
+        while True:
+            block = self.masks.read(1 << 20)
+            if not block:
+                break
+            records.write(block)
+        self.masks.close()
+        version = self.digest.hexdigest()[:16].encode("ascii")
+        records.seek(0)
+        records.write(
+            BINARY_HEADER.pack(BINARY_MAGIC, BINARY_FORMAT, 5, self.count, version, source_size, source_mtime)
+        )
+        records.close()
+
+        if self.path.endswith(".zst"):
+            with open(self.tmp_path, "rb") as src, open_compressed(
+                self.path + ".tmp", "wb", compressed=True, zstd_dict=self.zstd_dict
+            ) as dst:
+                while True:
+                    block = src.read(1 << 20)
+                    if not block:
+                        break
+                    dst.write(block)
+            os.remove(self.tmp_path)
+            os.replace(self.path + ".tmp", self.path)
+        else:
+            os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        """Discard the partial file."""
+        self.records.close()
+        self.masks.close()
+        with contextlib.suppress(OSError):
+            os.remove(self.tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class WordCorpus:
+    # Corpora loaded from files, keyed by (absolute path, mtime, size)
+    _loaded = {}
+
+    def __init__(self, words, path=None):
+        """
+        A dictionary of 5-letter words and everything derived from it.
+
+        Components take a corpus by reference so the word file is parsed once
+        per process and the per-word arrays are built once and shared. Derived
+        data is computed on first use.
+
+        Parameters:
+            words (Sequence[str]): 5-letter lowercase words; word ids are their positions.
+            path (str, optional): File the words were read from.
+        """
+        self.words = tuple(words)
+        self.size = len(self.words)
+        self.path = path
+
+    @classmethod
+    def load(cls, path="dict/words_filtered.txt", zstd_dict=None):
+        """
+        Load a word file, reusing the corpus if this process already loaded
+        the unchanged file. A ".zst" file compressed with a trained dictionary
+        needs the same zstd_dict to be read.
+
+        Accepts the text format (one word per line) or the binary format
+        written by save_binary, either of them optionally zstd-compressed
+        (".zst"). For a text file whose binary sibling (same name, .bin) was
+        written from it, the binary one is mapped instead; the sibling is only
+        trusted if the size and mtime it recorded match the text file.
+
+        :raises FileNotFoundError: if the file does not exist.
+        :raises ValueError: if a binary file is malformed.
+        """
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+        corpus = cls._loaded.get(key)
+        if corpus is None:
+            binary_path = os.path.splitext(strip_zst(path))[0] + ".bin"
+            if strip_zst(path).endswith(".bin"):
+                corpus = cls.load_binary(path, zstd_dict)
+            elif os.path.exists(binary_path):
+                with contextlib.suppress(ValueError):
+                    corpus = cls.load_binary(binary_path)
+                if corpus is not None and corpus.source != (stat.st_size, stat.st_mtime_ns):
+                    # Stale (e.g. the text file was replaced by an older copy)
+                    corpus = None
+            if corpus is None:
+                with open_compressed(path, "rt", zstd_dict=zstd_dict) as f:
+                    corpus = cls((line.strip() for line in f if line.strip()), path)
+            cls._loaded[key] = corpus
+        return corpus
+
+    @classmethod
+    def load_binary(cls, path, zstd_dict=None):
+        """
+        Memory-map a binary dictionary; the letter codes and masks are used in
+        place, with no per-word parsing. A ".zst" file is decompressed into
+        memory instead, using zstd_dict if it was compressed with one.
+
+        :raises ValueError: if the file is not a valid binary dictionary.
+        """
+        if path.endswith(".zst"):
+            with open_compressed(path, "rb", zstd_dict=zstd_dict) as f:
+                buffer = f.read()
+        else:
+            with open(path, "rb") as f:
+                # The mapping stays valid after the file is closed
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(buffer) < BINARY_HEADER.size:
+            raise ValueError(f"{path} is too short to be a binary dictionary")
+        magic, fmt, length, count, version, source_size, source_mtime = BINARY_HEADER.unpack_from(buffer)
+        if magic != BINARY_MAGIC or fmt != BINARY_FORMAT or length != 5:
+            raise ValueError(f"{path} is not a binary dictionary (format {BINARY_FORMAT})")
+        records_end = BINARY_HEADER.size + count * 5
+        masks_start = (records_end + 3) // 4 * 4
+        if len(buffer) < masks_start + count * 4:
+            raise ValueError(f"{path} is truncated")
+
+        corpus = cls.__new__(cls)
+        corpus.size = count
+        corpus.path = path
+        corpus._buffer = buffer
+        corpus.version = version.decode("ascii")
+        # (size, mtime in ns) of the text file this is a copy of, or (0, 0)
+        corpus.source = (source_size, source_mtime)
+        corpus.letters = np.frombuffer(buffer, dtype=np.uint8, count=count * 5, offset=BINARY_HEADER.size).reshape(
+            count, 5
+        )
+        corpus.mask_array = np.frombuffer(buffer, dtype="<u4", count=count, offset=masks_start)
+        return corpus
+
+    def save_binary(self, path, source=None, zstd_dict=None):
+        """
+        Write the corpus in the binary format, replacing the file atomically.
+        A path ending in ".zst" is written zstd-compressed.
+
+        Parameters:
+            path (str): The binary dictionary to write.
+            source (str, optional): Text word file with the same words (see
+                BinaryDictionaryWriter.close).
+            zstd_dict (bytes, optional): Trained zstd dictionary for a ".zst" path.
+
+        :raises OSError: if the file cannot be written.
+        """
+        writer = BinaryDictionaryWriter(path, zstd_dict)
+        try:
+            writer.write(self.letters)
+        except BaseException:
+            writer.abort()
+            raise
+        writer.close(source)
+
+    def __len__(self):
+        return self.size
+
+    @functools.cached_property
+    def words(self):
+        """The words as a tuple of strings (decoded from the letter codes when loaded from binary)."""
+        text = (self.letters + 97).tobytes().decode("ascii")
+        return tuple(text[i : i + 5] for i in range(0, len(text), 5))
+
+    @functools.cached_property
+    def version(self):
+        """words_hash() of the word list, used to version caches and derived files."""
+        return words_hash(self.words)
+
+    @functools.cached_property
+    def word_ids(self):
+        """dict mapping each word to its id."""
+        return {word: i for i, word in enumerate(self.words)}
+
+    @functools.cached_property
+    def mask_array(self):
+        """(N,) uint32 letter-set mask of each word (see letter_mask)."""
+        bits = np.left_shift(np.uint32(1), self.letters.astype(np.uint32))
+        return np.bitwise_or.reduce(bits, axis=1)
+
+    @functools.cached_property
+    def masks(self):
+        """Letter-set mask of each word as a tuple of ints, for per-word checks."""
+        return tuple(self.mask_array.tolist())
+
+    @functools.cached_property
+    def letters(self):
+        """(N, 5) uint8 letter codes (see encode_words)."""
+        return encode_words(self.words)
+
+    @functools.cached_property
+    def presence(self):
+        """(N, 26) letter presence matrix (see letter_presence)."""
+        return ((self.mask_array[:, None] >> np.arange(26, dtype=np.uint32)) & 1).astype(np.int64)
+
+    @functools.cached_property
+    def counts(self):
+        """(N, 26) uint8 number of times each letter occurs in each word."""
+        counts = np.zeros((self.size, 26), dtype=np.uint8)
+        rows = np.repeat(np.arange(self.size), 5)
+        np.add.at(counts, (rows, self.letters.ravel()), 1)
+        return counts
+
+
+def as_corpus(words):
+    """Return words unchanged if it is a WordCorpus, else wrap the sequence in one."""
+    return words if isinstance(words, WordCorpus) else WordCorpus(words)
+
+
+class FeedbackMatrix:
+    def __init__(self, words, patterns, path=None):
+        """
+        Feedback pattern of every guess against every answer.
+
+        Parameters:
+            words (WordCorpus | Sequence[str]): The dictionary; used both as guesses and answers.
+            patterns (numpy.ndarray): (N, N) uint8 array, patterns[g, a] being the
+                feedback for guess words[g] against answer words[a].
+            path (str, optional): The .npy file the patterns are mapped from, if any.
+        """
+        self.corpus = as_corpus(words)
+        self.words = self.corpus.words
+        self.patterns = patterns
+        self.path = path
+
+    @staticmethod
+    def compute(guesses, answers, chunk_size=256):
+        """
+        Compute the feedback patterns for letter-code arrays (see encode_words).
+
+        Guesses are processed in chunks to bound the temporary memory.
+
+        Parameters:
+            guesses (numpy.ndarray): (G, 5) letter codes.
+            answers (numpy.ndarray): (A, 5) letter codes.
+            chunk_size (int): Number of guesses per chunk.
+
+        Returns:
+            numpy.ndarray: (G, A) uint8 pattern codes.
+        """
+        result = np.empty((len(guesses), len(answers)), dtype=np.uint8)
+        for start in range(0, len(guesses), chunk_size):
+            chunk = guesses[start : start + chunk_size]
+            green = chunk[:, None, :] == answers[None, :, :]
+            not_green = ~green
+            out = np.zeros(green.shape[:2], dtype=np.uint8)
+            for i in range(5):
+                letter = chunk[:, i][:, None]
+                # Unmatched copies of this letter in the answer...
+                available = np.zeros(out.shape, dtype=np.uint8)
+                for k in range(5):
+                    available += (answers[None, :, k] == letter) & not_green[:, :, k]
+                # ...minus the ones already claimed by earlier non-green guess letters
+                claimed = np.zeros(out.shape, dtype=np.uint8)
+                for j in range(i):
+                    claimed += (chunk[:, j] == chunk[:, i])[:, None] & not_green[:, :, j]
+                yellow = not_green[:, :, i] & (available > claimed)
+                out += np.uint8(3**i) * (green[:, :, i] * np.uint8(2) + yellow)
+            result[start : start + len(chunk)] = out
+        return result
+
+    @classmethod
+    def build(cls, words):
+        """Compute the full guess x answer matrix for the given words in memory."""
+        corpus = as_corpus(words)
+        return cls(corpus, cls.compute(corpus.letters, corpus.letters))
+
+    @staticmethod
+    def path_for(words, save_dir="dict"):
+        """Return the .npy path for a word list; the name changes with the list's hash."""
+        return os.path.join(save_dir, f"patterns-{as_corpus(words).version}.npy")
+
+    @classmethod
+    def load(cls, words, save_dir="dict", compress=False, zstd_dict=None):
+        """
+        Open the precomputed matrix for the given words, building it first if needed.
+
+        A plain .npy file is opened with mmap_mode, so startup does not read
+        the whole table and concurrent processes share the same pages. A
+        zstd-compressed copy (.npy.zst) takes far less disk and is
+        stream-decompressed into memory instead; it is only used when there
+        is no plain file.
+
+        Parameters:
+            words (WordCorpus | Sequence[str]): The dictionary.
+            save_dir (str): Directory holding the .npy file.
+            compress (bool): Save a newly built matrix as .npy.zst.
+            zstd_dict (bytes, optional): Trained zstd dictionary for the .zst file.
+
+        Returns:
+            FeedbackMatrix: The matrix.
+        """
+        corpus = as_corpus(words)
+        path = cls.path_for(corpus, save_dir)
+        compressed_path = path + ".zst"
+        if not os.path.exists(path) and not os.path.exists(compressed_path):
+            print(f"Building feedback matrix for {len(corpus)} words ...")
+            patterns = cls.build(corpus).patterns
+            os.makedirs(save_dir, exist_ok=True)
+            target = compressed_path if compress else path
+            tmp_path = target + ".tmp"
+            with open_compressed(tmp_path, "wb", compressed=compress, zstd_dict=zstd_dict) as f:
+                np.save(f, patterns)
+            os.replace(tmp_path, target)
+            print(f"Saved feedback matrix to {target}")
+
+        if os.path.exists(path):
+            return cls(corpus, np.load(path, mmap_mode="r"), path)
+        with open_compressed(compressed_path, "rb", zstd_dict=zstd_dict) as f:
+            return cls(corpus, np.lib.format.read_array(f))
+
+
+def bucket_counts(patterns, candidate_ids, guess_ids=None, chunk_elements=1 << 22):
+    """
+    Count how the candidates split into feedback buckets for each guess.
+
+    Each guess row is offset by its row number * PATTERN_COUNT so one
+    bincount call counts the buckets of a whole chunk of guesses.
+
+    Parameters:
+        patterns (numpy.ndarray): Guess x answer pattern matrix (see FeedbackMatrix).
+        candidate_ids (Sequence[int]): Ids of the remaining candidate answers.
+        guess_ids (Sequence[int], optional): Ids of the guesses to score; all rows if None.
+        chunk_elements (int): Approximate number of pattern cells per chunk.
+
+    Returns:
+        numpy.ndarray: (G, PATTERN_COUNT) int64 array of bucket sizes.
+    """
+    candidate_ids = np.asarray(candidate_ids, dtype=np.intp)
+    guess_ids = np.arange(len(patterns)) if guess_ids is None else np.asarray(guess_ids, dtype=np.intp)
+    counts = np.empty((len(guess_ids), PATTERN_COUNT), dtype=np.int64)
+    step = max(1, chunk_elements // max(1, len(candidate_ids)))
+    for start in range(0, len(guess_ids), step):
+        rows = guess_ids[start : start + step]
+        block = patterns[np.ix_(rows, candidate_ids)].astype(np.intp)
+        block += (np.arange(len(rows)) * PATTERN_COUNT)[:, None]
+        counts[start : start + len(rows)] = np.bincount(
+            block.ravel(), minlength=len(rows) * PATTERN_COUNT
+        ).reshape(len(rows), PATTERN_COUNT)
+    return counts
+
+
+# Pattern matrix of a pool worker process, mapped once by _attach_patterns
+_worker_patterns = None
+
+
+def _attach_patterns(path):
+    global _worker_patterns
+    _worker_patterns = np.load(path, mmap_mode="r")
+
+
+def _bucket_chunk(candidate_ids, guess_ids):
+    return bucket_counts(_worker_patterns, candidate_ids, guess_ids).astype(np.int32)
+
+
+class BucketCounter:
+    def __init__(self, matrix, workers=1, min_parallel_cells=1 << 23):
+        """
+        Compute bucket_counts, splitting large jobs across a process pool.
+
+        Workers memory-map the matrix file themselves, so the pattern data is
+        shared through the page cache and only guess/candidate ids are sent
+        per task.
+
+        Parameters:
+            matrix (FeedbackMatrix): Precomputed feedback patterns.
+            workers (int | None): Number of worker processes; None uses every
+                core, 1 always runs serially.
+            min_parallel_cells (int): Jobs with fewer guess x candidate cells
+                run serially, where the pool overhead would not pay off.
+        """
+        self.matrix = matrix
+        self.workers = workers or os.cpu_count() or 1
+        self.min_parallel_cells = min_parallel_cells
+        self.executor = None
+
+    def counts(self, candidate_ids, guess_ids=None):
+        """Same as bucket_counts(matrix.patterns, candidate_ids, guess_ids)."""
+        patterns = self.matrix.patterns
+        if guess_ids is None:
+            guess_ids = np.arange(len(patterns))
+        guess_ids = np.asarray(guess_ids, dtype=np.intp)
+        candidate_ids = np.asarray(candidate_ids, dtype=np.intp)
+
+        if (
+            self.workers <= 1
+            or self.matrix.path is None
+            or len(guess_ids) * len(candidate_ids) < self.min_parallel_cells
+        ):
+            return bucket_counts(patterns, candidate_ids, guess_ids)
+
+        if self.executor is None:
+            import concurrent.futures
+
+            self.executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_attach_patterns, initargs=(self.matrix.path,)
+            )
+        # A few chunks per worker keeps them busy when chunk costs differ
+        chunks = np.array_split(guess_ids, self.workers * 4)
+        results = self.executor.map(_bucket_chunk, [candidate_ids] * len(chunks), chunks)
+        return np.concatenate(list(results)).astype(np.int64)
+
+    def close(self):
+        """Shut down the worker processes, if any were started."""
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+
+class Scorer:
+    """
+    Base class for guess-ranking strategies.
+
+    A scorer maps a RankingQuery to one score per guess. Strategies that
+    look at feedback buckets read query.counts, which is computed once per
+    query and shared by every scorer applied to it.
+    """
+
+    name = None
+    higher_is_better = True
+    needs_buckets = True
+
+    def score(self, query):
+        """Return a numpy array with one score per guess in query.guess_ids."""
+        raise NotImplementedError
+
+
+# Scorer classes by name, filled in by @register_scorer
+SCORERS = {}
+
+
+def register_scorer(cls):
+    """Class decorator that makes a Scorer selectable by its name."""
+    SCORERS[cls.name] = cls
+    return cls
+
+
+@register_scorer
+class FrequencyScorer(Scorer):
+    """Sum of letter frequencies over the guess's distinct letters."""
+
+    name = "frequency"
+    needs_buckets = False
+
+    def score(self, query):
+        return query.ranker.presence[query.guess_ids] @ query.ranker.letter_weights()
+
+
+@register_scorer
+class EntropyScorer(Scorer):
+    """Shannon entropy in bits of the guess's feedback over the candidates."""
+
+    name = "entropy"
+
+    def score(self, query):
+        # H = log2(n) - sum(c * log2(c)) / n, with c * log2(c) from a lookup table
+        n = len(query.candidate_ids)
+        sizes = np.arange(n + 1, dtype=np.float64)
+        table = np.zeros(n + 1)
+        table[1:] = sizes[1:] * np.log2(sizes[1:])
+        return np.log2(n) - table[query.counts].sum(axis=1) / n
+
+
+@register_scorer
+class MinimaxScorer(Scorer):
+    """Size of the largest feedback bucket, i.e. the worst case after guessing."""
+
+    name = "minimax"
+    higher_is_better = False
+
+    def score(self, query):
+        return query.counts.max(axis=1)
+
+
+@register_scorer
+class ExpectedSizeScorer(Scorer):
+    """Expected number of candidates left after the guess."""
+
+    name = "expected"
+    higher_is_better = False
+
+    def score(self, query):
+        counts = query.counts
+        return (counts * counts).sum(axis=1) / len(query.candidate_ids)
+
+
+@register_scorer
+class PositionalScorer(Scorer):
+    """Positional plus global letter frequencies over the current candidates."""
+
+    name = "positional"
+    needs_buckets = False
+
+    def score(self, query):
+        ranker = query.ranker
+        return positional_scores(ranker.letters, ranker.presence, query.candidate_ids, query.guess_ids)
+
+
+class RankingQuery:
+    def __init__(self, ranker, candidate_ids, guess_ids):
+        """
+        The candidates and guess pool of one ranking request.
+
+        Parameters:
+            ranker (GuessRanker): The ranker that created the query.
+            candidate_ids (numpy.ndarray): Ids of the remaining candidate answers.
+            guess_ids (numpy.ndarray): Ids of the guesses to score.
+        """
+        self.ranker = ranker
+        self.candidate_ids = candidate_ids
+        self.guess_ids = guess_ids
+        self._counts = None
+
+    def signature(self):
+        """Short digest identifying the candidate and guess ids, for cache keys."""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(np.asarray(self.candidate_ids, dtype=np.int64).tobytes())
+        digest.update(b"|")
+        digest.update(np.asarray(self.guess_ids, dtype=np.int64).tobytes())
+        return digest.digest()
+
+    @property
+    def counts(self):
+        """(G, PATTERN_COUNT) bucket sizes, computed on first use."""
+        if self._counts is None:
+            self._counts = self.ranker.buckets.counts(self.candidate_ids, self.guess_ids)
+        return self._counts
+
+
+class GuessRanker:
+    def __init__(self, words, analyzer=None, matrix=None, workers=1, cache=None):
+        """
+        Rank guesses with any registered scorer (see SCORERS).
+
+        Parameters:
+            words (WordCorpus | Sequence[str]): The dictionary.
+            analyzer (LetterFrequencyAnalyzer, optional): Letter weights for the
+                "frequency" strategy.
+            matrix (FeedbackMatrix, optional): Feedback patterns, required by
+                the bucket-based strategies ("entropy", "minimax", "expected").
+            workers (int | None): Processes used for large bucket counts (see BucketCounter).
+            cache (LRUCache, optional): Cache for rankings, keyed by the dictionary
+                version, strategy, top_n and the candidate and guess ids. A private
+                64-entry cache is used if None.
+        """
+        self.corpus = as_corpus(words)
+        self.words = self.corpus.words
+        self.analyzer = analyzer
+        self.matrix = matrix
+        self.version = self.corpus.version
+        self.cache = LRUCache(64) if cache is None else cache
+        self.word_ids = self.corpus.word_ids
+        self.buckets = BucketCounter(matrix, workers) if matrix is not None else None
+        self.letters = self.corpus.letters
+        self.presence = self.corpus.presence
+
+    def close(self):
+        """Shut down the bucket-counting worker processes, if any were started."""
+        if self.buckets is not None:
+            self.buckets.close()
+
+    def letter_weights(self):
+        """Letter frequencies from the analyzer as a length-26 vector."""
+        if self.analyzer is None:
+            raise ValueError("The 'frequency' strategy needs a LetterFrequencyAnalyzer")
+        if isinstance(self.analyzer, CandidateFrequencyAnalyzer):
+            # Already a count vector; skip the round trip through a Counter
+            return self.analyzer.counts.astype(np.int64)
+        freqs = self.analyzer.frequencies
+        return np.array([freqs.get(chr(97 + i), 0) for i in range(26)], dtype=np.int64)
+
+    def query(self, word_list, guess_list=None):
+        """
+        Prepare a ranking request; reuse it to rank with several strategies.
+
+        Parameters:
+            word_list (list[str]): Remaining candidate answers.
+            guess_list (list[str], optional): Allowed guesses; the whole dictionary if None.
+
+        Returns:
+            RankingQuery: The query.
+        """
+        candidate_ids = np.array([self.word_ids[w] for w in word_list], dtype=np.intp)
+        if guess_list is None:
+            guess_ids = np.arange(len(self.words))
+        else:
+            guess_ids = np.array([self.word_ids[w] for w in guess_list], dtype=np.intp)
+        return RankingQuery(self, candidate_ids, guess_ids)
+
+    def rank(self, query, strategy="entropy", top_n=20):
+        """
+        Rank the guesses of a query.
+
+        Parameters:
+            query (RankingQuery): The query from self.query().
+            strategy (str | list[str]): Scorer name, or several names where each
+                later one breaks ties of the ones before it.
+            top_n (int): Number of top words to return.
+
+        Returns:
+            list[tuple[str, float]]: List of (word, score) with the first
+            strategy's score, best first; remaining ties prefer guesses that
+            are still candidates.
+
+        :raises ValueError: if a strategy is unknown or lacks the data it needs.
+        """
+        names = [strategy] if isinstance(strategy, str) else list(strategy)
+        for name in names:
+            if name not in SCORERS:
+                raise ValueError(f"Unknown strategy {name!r}, expected one of {', '.join(SCORERS)}")
+        if len(query.candidate_ids) == 0:
+            return []
+
+        # Frequency scores depend on the analyzer's current weights, not just the ids
+        weights = self.letter_weights().tobytes() if "frequency" in names else None
+        key = (self.version, tuple(names), top_n, weights, query.signature())
+        ranked = self.cache.get(key)
+        if ranked is None:
+            ranked = self._rank(query, names, top_n)
+            self.cache.put(key, ranked)
+        return list(ranked)
+
+    def _rank(self, query, names, top_n):
+        scorers = [SCORERS[name]() for name in names]
+        if any(s.needs_buckets for s in scorers) and self.buckets is None:
+            raise ValueError("Bucket-based strategies need a FeedbackMatrix")
+
+        scores = [scorer.score(query) for scorer in scorers]
+        is_candidate = np.isin(query.guess_ids, query.candidate_ids)
+        # np.lexsort sorts by the last key first; round so float noise does not
+        # defeat the tie-breaks
+        keys = [query.guess_ids, ~is_candidate]
+        for scorer, values in reversed(list(zip(scorers, scores))):
+            values = np.round(values, 9)
+            keys.append(-values if scorer.higher_is_better else values)
+        order = select_top(keys, top_n)
+
+        primary = scores[0]
+        return tuple((self.words[query.guess_ids[i]], primary[i].item()) for i in order)
+
+    def suggest_best_words(self, word_list, strategy="entropy", guess_list=None, top_n=20):
+        """Shortcut for self.rank(self.query(word_list, guess_list), strategy, top_n)."""
+        return self.rank(self.query(word_list, guess_list), strategy, top_n)
+
+
+class OpeningBook:
+    def __init__(self, words, version, strategy, moves):
+        """
+        Precomputed decision tree: opener -> feedback -> best next guess -> ...
+
+        Parameters:
+            words (Sequence[str]): The dictionary the book was built for.
+            version (str): WordCorpus.version of that dictionary.
+            strategy (str): Scorer name used to pick every guess.
+            moves (dict[bytes, int]): Word id of the guess to play after the
+                feedback codes in the key (b"" holds the opener).
+        """
+        self.words = words
+        self.version = version
+        self.strategy = strategy
+        self.moves = moves
+
+    @classmethod
+    def build(cls, ranker, strategy="entropy", opener=None):
+        """
+        Play out the whole tree offline.
+
+        Every node ranks the full guess pool against the candidates left in
+        its feedback bucket; buckets of one or two words guess a candidate.
+
+        Parameters:
+            ranker (GuessRanker): Ranker with a FeedbackMatrix.
+            strategy (str): Scorer used at every node.
+            opener (str, optional): First guess; the strategy's best if None.
+
+        Returns:
+            OpeningBook: The finished book.
+        """
+        words = ranker.words
+        patterns = ranker.matrix.patterns
+        all_ids = np.arange(len(words))
+        if opener is None:
+            opener = ranker.rank(ranker.query(words), strategy, top_n=1)[0][0]
+
+        moves = {}
+        pending = [(b"", ranker.word_ids[opener], all_ids)]
+        while pending:
+            path, guess, candidate_ids = pending.pop()
+            moves[path] = guess
+            feedback = np.asarray(patterns[guess, candidate_ids])
+            for code in np.unique(feedback):
+                if code == ALL_GREEN:
+                    continue
+                bucket = candidate_ids[feedback == code]
+                if len(bucket) <= 2:
+                    best = bucket[0]
+                else:
+                    query = RankingQuery(ranker, bucket, all_ids)
+                    best = ranker.word_ids[ranker.rank(query, strategy, top_n=1)[0][0]]
+                pending.append((path + bytes([code]), best, bucket))
+        return cls(words, ranker.version, strategy, moves)
+
+    def save(self, path, zstd_dict=None):
+        """
+        Write the book to a pickle file (zstd-compressed for ".zst", using
+        zstd_dict if given), replacing it atomically.
+        """
+        data = {"version": self.version, "strategy": self.strategy, "moves": self.moves}
+        tmp_path = path + ".tmp"
+        with open_compressed(tmp_path, "wb", compressed=path.endswith(".zst"), zstd_dict=zstd_dict) as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, ranker, path="dict/book.pkl", strategy="entropy", zstd_dict=None, workers=None):
+        """
+        Open the book at path, rebuilding it if it was made for another
+        dictionary (by WordCorpus.version) or strategy.
+
+        Parameters:
+            ranker (GuessRanker): Ranker used if the book has to be rebuilt.
+            path (str): Pickle file of the book.
+            strategy (str): Scorer the book should follow.
+            zstd_dict (bytes, optional): Trained zstd dictionary of a ".zst" book.
+            workers (int | None): Processes used if the book has to be rebuilt
+                (see BucketCounter); the ranker's own setting if None. A pool
+                started for the rebuild is shut down afterwards.
+
+        Returns:
+            OpeningBook: The up-to-date book.
+        """
+        words = ranker.words
+        version = ranker.version
+        if os.path.exists(path):
+            with open_compressed(path, "rb", zstd_dict=zstd_dict) as f:
+                data = pickle.load(f)
+            if data["version"] == version and data["strategy"] == strategy:
+                return cls(words, version, strategy, data["moves"])
+            print(f"Opening book {path} is out of date, rebuilding ...")
+        else:
+            print(f"Building opening book {path} ...")
+        if workers is None or workers == ranker.buckets.workers:
+            book = cls.build(ranker, strategy)
+        else:
+            builder = GuessRanker(ranker.corpus, matrix=ranker.matrix, workers=workers)
+            try:
+                book = cls.build(builder, strategy)
+            finally:
+                builder.close()
+        book.save(path, zstd_dict)
+        print(f"Saved opening book with {len(book.moves)} positions to {path}")
+        return book
+
+    @property
+    def opener(self):
+        """The first guess."""
+        return self.words[self.moves[b""]]
+
+    def next_guess(self, history):
+        """
+        Look up the guess to play after the given turns.
+
+        Parameters:
+            history (list[tuple[str, int]]): (guess, feedback code) of every turn so far.
+
+        Returns:
+            str | None: The next guess, or None if the history left the book
+            (a different guess was played or the feedback is impossible).
+        """
+        path = b""
+        for guess, code in history:
+            expected = self.moves.get(path)
+            if expected is None or self.words[expected] != guess:
+                return None
+            path += bytes([code])
+        move = self.moves.get(path)
+        return None if move is None else self.words[move]
+
+
+class PositionalIndex:
+    def __init__(self, words):
+        """
+        Build an inverted index from (position, letter) to a bitset of word ids.
+
+        Bitsets are plain Python integers where bit i stands for words[i], so a
+        query is a handful of integer ANDs instead of a pass over every word.
+
+        Parameters:
+            words (WordCorpus | Sequence[str]): The dictionary, 5-letter lowercase words.
+        """
+        words = as_corpus(words).words
+        self.size = len(words)
+        self.all = (1 << self.size) - 1
+        self.positions = [dict() for _ in range(5)]
+        self.letters = {}
+
+        positions = [dict() for _ in range(5)]
+        for i, word in enumerate(words):
+            for pos, ch in enumerate(word):
+                positions[pos].setdefault(ch, []).append(i)
+
+        # Build each bitset in one shot from its id list rather than OR-ing
+        # one bit at a time, which would be quadratic in the dictionary size
+        for pos, table in enumerate(positions):
+            for ch, ids in table.items():
+                self.positions[pos][ch] = self._to_bitset(ids)
+        for ch in {ch for table in self.positions for ch in table}:
+            bits = 0
+            for table in self.positions:
+                bits |= table.get(ch, 0)
+            self.letters[ch] = bits
+
+    def _to_bitset(self, ids):
+        flags = bytearray(b"0" * self.size)
+        for i in ids:
+            flags[i] = 49  # ord("1")
+        return int(flags[::-1].decode(), 2)
+
+    def at(self, pos, letter):
+        """Bitset of words with the given letter at the given position."""
+        return self.positions[pos].get(letter, 0)
+
+    def containing(self, letter):
+        """Bitset of words containing the given letter anywhere."""
+        return self.letters.get(letter, 0)
+
+    def match(self, known_pattern, unknowns, excluded_letters):
+        """
+        Return the ids of words matching the clues (see WordleSolver.filter_candidates).
+
+        Returns:
+            list[int]: Matching word ids, in ascending order.
+        """
+        bits = self.all
+        for pos, ch in enumerate(known_pattern):
+            if ch:
+                bits &= self.at(pos, ch)
+        for idx, letter in unknowns:
+            bits &= self.containing(letter)
+            bits &= ~self.at(idx, letter)
+        for letter in set(excluded_letters):
+            bits &= ~self.containing(letter)
+        return self.ids(bits)
+
+    @staticmethod
+    def ids(bits):
+        """
+        Decode a bitset into a sorted list of word ids.
+
+        Parameters:
+            bits (int): The bitset to decode.
+
+        Returns:
+            list[int]: Ids of the set bits, in ascending order.
+        """
+        # One C-level pass over the bytes, instead of a find() per set bit
+        data = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+        return np.flatnonzero(np.unpackbits(np.frombuffer(data, dtype=np.uint8), bitorder="little")).tolist()
+
+
+class NumpyIndex:
+    def __init__(self, words):
+        """
+        Store the dictionary as dense arrays for vectorized filtering.
+
+        Parameters:
+            words (WordCorpus | Sequence[str]): The dictionary, 5-letter lowercase words.
+        """
+        corpus = as_corpus(words)
+        self.size = len(corpus)
+        # (N, 5) letter codes 0-25 and (N, 26) per-word letter counts
+        self.letters = corpus.letters
+        self.counts = corpus.counts
+
+    def match(self, known_pattern, unknowns, excluded_letters):
+        """
+        Return the ids of words matching the clues (see WordleSolver.filter_candidates).
+
+        Green, yellow and gray clues are combined into a single boolean mask.
+
+        Returns:
+            list[int]: Matching word ids, in ascending order.
+        """
+        mask = np.ones(self.size, dtype=bool)
+        for pos, ch in enumerate(known_pattern):
+            if ch:
+                mask &= self.letters[:, pos] == ord(ch) - 97
+        for idx, letter in unknowns:
+            code = ord(letter) - 97
+            mask &= (self.counts[:, code] > 0) & (self.letters[:, idx] != code)
+        if excluded_letters:
+            codes = [ord(ch) - 97 for ch in set(excluded_letters)]
+            mask &= ~self.counts[:, codes].any(axis=1)
+        return np.flatnonzero(mask).tolist()
+
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+class LRUCache:
+    def __init__(self, maxsize=256):
+        """
+        Bounded mapping that evicts the least recently used entry when full.
+
+        Parameters:
+            maxsize (int): Maximum number of entries kept.
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def get(self, key, default=None):
+        """Return the cached value for key, counting a hit or a miss."""
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Store a value, evicting the oldest entry if the cache is full."""
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        self._data.clear()
+        self.hits = self.misses = 0
+
+    def info(self):
+        """Hit/miss statistics, in the same shape as functools.lru_cache's cache_info()."""
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._data))
+
+    def __len__(self):
+        return len(self._data)
+
+
+class Constraints:
+    def __init__(self, greens, banned, required, excluded):
+        """
+        Canonical form of a set of clues.
 
-    def download(self):
-        """Download the dictionary from the given url and save it to
-        the given directory under the given filename.
+        Parameters:
+            greens (tuple[str | None]): Known letter per position, or None.
+            banned (tuple[frozenset[str]]): Letters known not to be at each position.
+            required (frozenset[str]): Letters that must appear somewhere.
+            excluded (frozenset[str]): Letters that must not appear at all.
+        """
+        self.greens = tuple(greens)
+        self.banned = tuple(frozenset(b) for b in banned)
+        self.required = frozenset(required)
+        self.excluded = frozenset(excluded)
 
-        Prints a message on success or failure.
+    @classmethod
+    def from_clues(cls, known_pattern, unknowns, excluded_letters):
+        """Build constraints from the arguments of WordleSolver.filter_candidates."""
+        banned = [set() for _ in range(5)]
+        for idx, letter in unknowns:
+            banned[idx].add(letter)
+        return cls(
+            (ch if ch else None for ch in known_pattern),
+            banned,
+            (letter for _, letter in unknowns),
+            excluded_letters,
+        )
 
-        :raises requests.RequestException: if there is an error downloading
-            the file.
+    @classmethod
+    def from_history(cls, history):
         """
-        save_path = os.path.join(self.save_dir, self.filename)
-        try:
-            print(f"Downloading dictionary from {self.url} ...")
-            response = requests.get(self.url)
-            response.raise_for_status()
-            with open(save_path, "wb") as f:
-                f.write(response.content)
-            print(f"Saved dictionary to {save_path}")
-        except requests.RequestException as e:
-            print(f"Error downloading file: {e}")
+        Build constraints from the feedback of played guesses.
 
+        Greens fix their position and yellows ban theirs. A gray letter is
+        excluded outright unless it was green or yellow somewhere else in the
+        history (a repeated letter), in which case only its position is banned.
 
-class WordFilter:
-    def __init__(self, input_path="dict/words.txt", output_path="dict/words_filtered.txt"):
-        self.input_path = input_path
-        self.output_path = output_path
-        self.pattern = re.compile(r"^[a-z]{5}$")
+        Parameters:
+            history (list[tuple[str, int]]): (guess, feedback code) of every turn.
 
-    def filter_and_save(self):
+        Returns:
+            Constraints: The combined constraints.
         """
-        Filters a list of words from the input file, keeping only those that match
-        the specified pattern (5-letter lowercase words), and saves the filtered
-        list in sorted order to the output file. If the input file is not found,
-        prints a message and exits.
+        greens = [None] * 5
+        banned = [set() for _ in range(5)]
+        required = set()
+        grays = []
+        for guess, code in history:
+            for pos, ch in enumerate(guess):
+                mark = code // 3**pos % 3
+                if mark == 2:
+                    greens[pos] = ch
+                    required.add(ch)
+                elif mark == 1:
+                    banned[pos].add(ch)
+                    required.add(ch)
+                else:
+                    grays.append((pos, ch))
 
-        The function ensures that the words are unique and sorted alphabetically
-        before writing them to the output file.
+        excluded = set()
+        for pos, ch in grays:
+            if ch in required:
+                if greens[pos] != ch:
+                    banned[pos].add(ch)
+            else:
+                excluded.add(ch)
+        return cls(greens, banned, required, excluded)
 
-        Prints the number of words saved to the output file.
+    def clues(self):
+        """
+        Convert back to (known_pattern, unknowns, excluded_letters).
 
-        :raises FileNotFoundError: if the input file does not exist.
+        Unknowns come out sorted, so equal constraints always yield equal clues.
         """
+        unknowns = [(idx, letter) for idx, letters in enumerate(self.banned) for letter in sorted(letters)]
+        return list(self.greens), unknowns, sorted(self.excluded)
 
-        if not os.path.exists(self.input_path):
-            print(f"File {self.input_path} not found!")
-            return
+    def tightens(self, other):
+        """
+        Return True if these constraints contain every clue in `other`,
+        so that every word matching self also matches other.
+        """
+        return (
+            all(old is None or old == new for old, new in zip(other.greens, self.greens))
+            and all(old <= new for old, new in zip(other.banned, self.banned))
+            and other.required <= self.required
+            and other.excluded <= self.excluded
+        )
+
+    def filter_ids(self, words, masks, ids):
+        """
+        Check the given word ids one by one against the constraints.
+
+        This is cheaper than a full index query once the id list is small.
+
+        Parameters:
+            words (Sequence[str]): The dictionary.
+            masks (Sequence[int]): Letter-set mask of each word (see letter_mask).
+            ids (Iterable[int]): Word ids to check.
+
+        Returns:
+            list[int]: The ids that still match, in their original order.
+        """
+        required = letter_mask(self.required)
+        excluded = letter_mask(self.excluded)
+        greens = [(pos, ch) for pos, ch in enumerate(self.greens) if ch]
+        banned = [(pos, letters) for pos, letters in enumerate(self.banned) if letters]
+        return [
+            i
+            for i in ids
+            if masks[i] & required == required
+            and not masks[i] & excluded
+            and all(words[i][pos] == ch for pos, ch in greens)
+            and all(words[i][pos] not in letters for pos, letters in banned)
+        ]
 
-        words_set = set()
+    def _key(self):
+        return (self.greens, self.banned, self.required, self.excluded)
 
-        with open(self.input_path, "r", encoding="utf-8") as infile:
-            for line in infile:
-                word = line.strip().lower()
-                if self.pattern.match(word):
-                    words_set.add(word)
+    def __eq__(self, other):
+        return isinstance(other, Constraints) and self._key() == other._key()
 
-        sorted_words = sorted(words_set)
+    def __hash__(self):
+        return hash(self._key())
 
-        with open(self.output_path, "w", encoding="utf-8") as outfile:
-            for word in sorted_words:
-                outfile.write(word + "\n")
+    def __repr__(self):
+        pattern = "".join(ch if ch else "." for ch in self.greens)
+        return (
+            f"Constraints({pattern!r}, banned={[''.join(sorted(b)) for b in self.banned]}, "
+            f"required={''.join(sorted(self.required))!r}, excluded={''.join(sorted(self.excluded))!r})"
+        )
 
-        print(f"Filtered words saved to {self.output_path}, total {len(sorted_words)} words.")
+
+ENGINES = {
+    "index": PositionalIndex,
+    "numpy": NumpyIndex,
+}
 
 
 class WordleSolver:
-    def __init__(self, words):
-        self.words = words
+    def __init__(self, words, engine="index", verbose=True, cache=None):
+        """
+        Parameters:
+            words (WordCorpus | Sequence[str]): The dictionary, 5-letter lowercase words.
+            engine (str): Filtering engine, one of ENGINES: "index" (bitset
+                inverted index, pure Python) or "numpy" (vectorized masks).
+            verbose (bool): Print the clues and match counts of each query.
+            cache (LRUCache, optional): Cache for query results, keyed by the
+                dictionary version and the canonical Constraints; may be shared
+                between solvers. A private 256-entry cache is used if None.
+
+        :raises ValueError: if the engine name is unknown.
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine {engine!r}, expected one of {', '.join(ENGINES)}")
+        self.corpus = as_corpus(words)
+        self.words = self.corpus.words
+        self.engine = engine
+        self.verbose = verbose
+        self.version = self.corpus.version
+        self.cache = LRUCache() if cache is None else cache
+        # Per-word letter-set masks for checking individual words cheaply
+        self.masks = self.corpus.masks
+        self.index = ENGINES[engine](self.corpus)
 
     def filter_candidates(self, known_pattern, unknowns, excluded_letters):
         """
@@ -96,46 +1791,130 @@ class WordleSolver:
         Returns:
             list[str]: The filtered list of words.
         """
-        pattern = "".join([ch if ch else "." for ch in known_pattern])
-        print(f"Regex Pattern: {pattern}")
-        regex = re.compile(pattern)
+        indices = self.match(Constraints.from_clues(known_pattern, unknowns, excluded_letters))
 
-        candidates = [w for w in self.words if regex.match(w)]
-        print(f"After Known Positions: {len(candidates)} words")
+        if self.verbose:
+            print(f"Known Pattern: {''.join(ch if ch else '.' for ch in known_pattern)}")
+            if unknowns:
+                print(f"Unknown Positions: {unknowns}")
+            if excluded_letters:
+                print(f"Excluded Letters: {excluded_letters}")
+            print(f"Matched: {len(indices)} words")
+            print(f"Query cache: {self.cache.info()}")
 
-        for idx, letter in unknowns:
-            candidates = [w for w in candidates if letter in w and w[idx] != letter]
-        if unknowns:
-            print(f"After Unknown Positions: {len(candidates)} words")
+        candidates = [self.words[i] for i in indices]
+        return candidates
 
-        if excluded_letters:
-            candidates = [w for w in candidates if all(ch not in w for ch in excluded_letters)]
-            print(f"Excluded Letters: {excluded_letters}")
-            print(f"After Excluded Letters: {len(candidates)} words")
+    def match(self, constraints):
+        """
+        Return the ids of the words matching the constraints, using the cache.
 
-        return candidates
+        Equivalent clue sets (e.g. the same yellows entered in another row or
+        order) share one Constraints signature and therefore one cache entry.
+
+        Parameters:
+            constraints (Constraints): The clues.
+
+        Returns:
+            tuple[int]: Matching word ids, in ascending order.
+        """
+        key = (self.version, constraints)
+        ids = self.cache.get(key)
+        if ids is None:
+            ids = tuple(self.index.match(*constraints.clues()))
+            self.cache.put(key, ids)
+        return ids
+
+
+class SolverSession:
+    def __init__(self, solver, analyzer=None):
+        """
+        Track the candidates of one game across repeated queries.
+
+        Clues only ever tighten during a game, so when a query keeps every
+        clue of the previous one the session narrows the surviving ids
+        instead of scanning the whole dictionary again.
+
+        Parameters:
+            solver (WordleSolver): The solver holding the dictionary and index.
+            analyzer (CandidateFrequencyAnalyzer, optional): Kept in step with
+                the candidates after every update.
+        """
+        self.solver = solver
+        self.analyzer = analyzer
+        self.constraints = None
+        self.ids = None
+
+    def reset(self):
+        """Forget the previous query; the next one scans the full dictionary."""
+        self.constraints = None
+        self.ids = None
+        if self.analyzer is not None:
+            self.analyzer.reset()
+
+    def update(self, known_pattern, unknowns, excluded_letters):
+        """
+        Apply the current clues and return the matching candidates.
+
+        Takes the same arguments as WordleSolver.filter_candidates.
+
+        Returns:
+            list[str]: The filtered list of words.
+        """
+        solver = self.solver
+        constraints = Constraints.from_clues(known_pattern, unknowns, excluded_letters)
+
+        if self.constraints is not None and constraints.tightens(self.constraints):
+            if constraints != self.constraints:
+                self.ids = constraints.filter_ids(solver.words, solver.masks, self.ids)
+            if solver.verbose:
+                print(f"Narrowed to {len(self.ids)} words")
+        else:
+            self.ids = list(solver.match(constraints))
+            if solver.verbose:
+                print(f"Full scan: {len(self.ids)} words")
+        self.constraints = constraints
+        if self.analyzer is not None:
+            self.analyzer.update(self.ids)
+
+        return [solver.words[i] for i in self.ids]
 
 
 class LetterFrequencyAnalyzer:
-    def __init__(self, input_path="dict/words_filtered.txt"):
+    def __init__(self, input_path="dict/words_filtered.txt", corpus=None):
+        """
+        Parameters:
+            input_path (str): Word file to analyze, loaded through WordCorpus.load
+                so it is shared with every other component.
+            corpus (WordCorpus, optional): Corpus to analyze instead of input_path.
+        """
         self.input_path = input_path
+        self.corpus = corpus
         self.frequencies = Counter()
 
-    def analyze(self):
+    def _corpus(self):
+        if self.corpus is None:
+            if not os.path.exists(self.input_path):
+                print(f"File {self.input_path} not found!")
+                return None
+            self.corpus = WordCorpus.load(self.input_path)
+        return self.corpus
+
+    def analyze(self, verbose=True):
         """
         Analyzes the frequency of letters in the filtered word list.
         Each letter is only counted once per word (i.e., no double-counting within a word).
-        Stores the result in self.frequencies.
+        Stores the result in self.frequencies and prints it if verbose is set.
         """
-        if not os.path.exists(self.input_path):
-            print(f"File {self.input_path} not found!")
+        corpus = self._corpus()
+        if corpus is None:
             return
 
-        with open(self.input_path, "r", encoding="utf-8") as file:
-            for line in file:
-                word = line.strip()
-                unique_letters = set(word)
-                self.frequencies.update(unique_letters)
+        counts = corpus.presence.sum(axis=0)
+        self.frequencies = Counter({chr(97 + i): int(c) for i, c in enumerate(counts) if c})
+
+        if not verbose:
+            return
 
         total = sum(self.frequencies.values())
         print(f"\nLetter Frequencies (each letter counted once per word):")
@@ -147,49 +1926,719 @@ class LetterFrequencyAnalyzer:
         """
         Suggest top words based on letter frequency weights.
 
-        If word_list is not provided, words will be read from self.input_path.
+        If word_list is not provided, the words of the analyzed corpus are scored.
 
         Parameters:
-            word_list (list[str], optional): List of words to score. If None, reads from input file.
+            word_list (list[str], optional): List of words to score. If None, uses the corpus.
             top_n (int): Number of top words to return.
 
         Returns:
-            list[tuple[str, float]]: List of (word, score), sorted by score descending.
+            list[tuple[str, float]]: List of (word, score), sorted by score descending;
+            equal scores keep their order in word_list.
         """
-        # If no word list provided, read from input file
+        # If no word list provided, score the corpus words
         if word_list is None:
-            if not os.path.exists(self.input_path):
-                print(f"File {self.input_path} not found!")
+            corpus = self._corpus()
+            if corpus is None:
                 return []
-            with open(self.input_path, "r", encoding="utf-8") as f:
-                word_list = [line.strip() for line in f if line.strip()]
+            word_list = corpus.words
 
-        # Compute score of each word based on letter frequency
-        scored_words = []
-        for word in word_list:
-            unique_letters = set(word)
-            score = sum(self.frequencies.get(ch, 0) for ch in unique_letters)
-            scored_words.append((word, score))
+        if not word_list:
+            return []
 
-        scored_words.sort(key=lambda x: x[1], reverse=True)
-        return scored_words[:top_n]
+        # Score every word at once: presence matrix (N, 26) times letter weights.
+        # The corpus has one already; any other list may have changed since the
+        # last call, so its matrix is rebuilt (it is cheap).
+        if self.corpus is not None and word_list is self.corpus.words:
+            presence = self.corpus.presence
+        else:
+            presence = letter_presence(word_list)
+        weights = np.array([self.frequencies.get(chr(97 + i), 0) for i in range(26)], dtype=np.int64)
+        scores = presence @ weights
 
+        order = select_top([np.arange(len(word_list)), -scores], top_n)
+        return [(word_list[i], scores[i].item()) for i in order]
 
-if __name__ == "__main__":
-    dict_url = "https://github.com/TitanComputer/wordle-list/raw/refs/heads/main/words"
 
-    downloader = DictionaryDownloader(dict_url)
-    downloader.download()
+class PositionalFrequencyAnalyzer:
+    def __init__(self, words, global_weight=0.5):
+        """
+        Letter frequencies by position, optionally over a subset of the words.
+
+        Parameters:
+            words (WordCorpus | Sequence[str]): The dictionary, 5-letter lowercase words.
+            global_weight (float): Weight of position-independent frequencies
+                when scoring, 0 (positional only) to 1 (global only).
+        """
+        self.corpus = as_corpus(words)
+        self.words = self.corpus.words
+        self.global_weight = global_weight
+        self.word_ids = self.corpus.word_ids
+        self.letters = self.corpus.letters
+        self.presence = self.corpus.presence
+        self.ids = None
+        self.frequencies = None
+
+    def analyze(self, word_list=None):
+        """
+        Compute the 5x26 position/letter counts over word_list (all words if None).
+
+        Stores the result in self.frequencies; cheap enough to redo on every
+        query for the current candidates.
+        """
+        self.ids = None if word_list is None else np.array([self.word_ids[w] for w in word_list], dtype=np.intp)
+        self.frequencies = positional_counts(self.letters, self.ids)
+
+    def suggest_best_words(self, word_list=None, top_n=20):
+        """
+        Suggest top words by combined positional and global frequency.
+
+        Frequencies come from the last analyze() call; word_list are the
+        words to score (every dictionary word if None).
+
+        Returns:
+            list[tuple[str, float]]: List of (word, score), best first; ties keep
+            dictionary order.
+        """
+        if word_list is None:
+            score_ids = np.arange(len(self.words))
+        else:
+            score_ids = np.array([self.word_ids[w] for w in word_list], dtype=np.intp)
+        if len(score_ids) == 0:
+            return []
+        scores = positional_scores(self.letters, self.presence, self.ids, score_ids, self.global_weight)
+        order = select_top([score_ids, -np.round(scores, 9)], top_n)
+        return [(self.words[score_ids[i]], float(scores[i])) for i in order]
+
+
+class CandidateFrequencyAnalyzer:
+    def __init__(self, words):
+        """
+        Letter frequencies over the current candidates, kept up to date incrementally.
+
+        Starts out counting every word. Each update() subtracts the words that
+        were eliminated rather than recounting the survivors, and recounts only
+        when that is cheaper or when candidates came back (clues were removed).
+
+        Parameters:
+            words (WordCorpus | Sequence[str]): The dictionary, 5-letter lowercase words.
+        """
+        self.corpus = as_corpus(words)
+        self.words = self.corpus.words
+        self.letters = self.corpus.letters
+        self.presence = self.corpus.presence
+        self.reset()
+
+    def reset(self):
+        """Count every dictionary word again."""
+        self.ids = np.arange(len(self.words))
+        self.counts = self.presence.sum(axis=0)
+        self.positional = positional_counts(self.letters)
+
+    def update(self, ids):
+        """
+        Make the counts reflect the given candidate ids.
+
+        Parameters:
+            ids (Sequence[int]): Ids of the current candidates, in ascending order.
+        """
+        ids = np.asarray(ids, dtype=np.intp)
+        removed = np.setdiff1d(self.ids, ids, assume_unique=True)
+        if len(removed) + len(ids) != len(self.ids) or len(removed) > len(ids):
+            # Not a subset of the previous candidates, or fewer words to add
+            # up than to take away
+            self.counts = self.presence[ids].sum(axis=0)
+            self.positional = positional_counts(self.letters, ids)
+        elif len(removed):
+            self.counts = self.counts - self.presence[removed].sum(axis=0)
+            self.positional = self.positional - positional_counts(self.letters, removed)
+        self.ids = ids
+
+    @property
+    def frequencies(self):
+        """Counter of letter -> number of candidates containing it, like LetterFrequencyAnalyzer."""
+        return Counter({chr(97 + i): int(c) for i, c in enumerate(self.counts) if c})
+
+    def suggest_best_words(self, word_list=None, top_n=20):
+        """
+        Suggest top words by letter frequency over the current candidates.
+
+        Parameters:
+            word_list (list[str], optional): Words to score; the current candidates if None.
+            top_n (int): Number of top words to return.
+
+        Returns:
+            list[tuple[str, int]]: List of (word, score), sorted by score descending;
+            equal scores keep their order in word_list.
+        """
+        if word_list is None:
+            word_list = [self.words[i] for i in self.ids]
+        if not word_list:
+            return []
+        scores = letter_presence(word_list) @ self.counts
+        order = select_top([np.arange(len(word_list)), -scores], top_n)
+        return [(word_list[i], scores[i].item()) for i in order]
+
+
+BatchResult = namedtuple("BatchResult", ["counts", "ids", "rankings"])
+
+FEEDBACK_MARKS = {"b": 0, "x": 0, ".": 0, "0": 0, "y": 1, "1": 1, "g": 2, "2": 2}
+
+
+def parse_feedback(text):
+    """
+    Parse feedback written as five marks into a feedback code.
+
+    Parameters:
+        text (str): One mark per position: "g" or "2" for green, "y" or "1"
+            for yellow, "b", "x", "." or "0" for gray, e.g. "gybbg".
+
+    Returns:
+        int: The base-3 feedback code (see feedback_pattern).
+
+    :raises ValueError: if the text is not five valid marks.
+    """
+    text = text.lower()
+    if len(text) != 5 or any(mark not in FEEDBACK_MARKS for mark in text):
+        raise ValueError(f"Invalid feedback {text!r}, expected five of g/y/b (or 2/1/0)")
+    return sum(FEEDBACK_MARKS[mark] * 3**pos for pos, mark in enumerate(text))
+
+
+def parse_turn(guess, feedback):
+    """
+    Validate one played turn.
+
+    Parameters:
+        guess (str): The 5-letter guess (any case).
+        feedback (str | int): Feedback as accepted by parse_feedback, or a
+            feedback code 0-242.
+
+    Returns:
+        tuple[str, int]: The lowercase guess and its feedback code.
+
+    :raises ValueError: if the guess or the feedback is invalid.
+    """
+    if not isinstance(guess, str) or len(guess) != 5:
+        raise ValueError(f"Invalid guess {guess!r}, expected 5 letters")
+    guess = guess.lower()
+    for ch in guess:
+        _check_letter(ch)
+    if isinstance(feedback, str):
+        return guess, parse_feedback(feedback)
+    if isinstance(feedback, bool) or not isinstance(feedback, numbers.Integral):
+        raise ValueError(f"Invalid feedback {feedback!r}, expected five marks or a code")
+    if not 0 <= feedback < PATTERN_COUNT:
+        raise ValueError(f"Invalid feedback code {feedback}, expected 0-{PATTERN_COUNT - 1}")
+    return guess, int(feedback)
+
+
+def _check_letter(ch):
+    if not (isinstance(ch, str) and len(ch) == 1 and "a" <= ch <= "z"):
+        raise ValueError(f"Invalid letter {ch!r}")
+    return ch
+
+
+def parse_query(query):
+    """
+    Turn a JSON query into (clues, history).
+
+    Every field is optional:
+        known: pattern like "s.a.." ("." "?" "_" or " " for an open position).
+        misplaced: yellow clues as [[position, letter], ...] or ["0r", ...],
+            positions 0-4.
+        excluded: gray letters, a string or a list.
+        history: played turns as [[guess, feedback], ...] or ["crane:bybbg", ...],
+            checked by parse_turn.
+
+    Returns:
+        tuple: ((known_pattern, unknowns, excluded_letters), history), where
+        history is a list of (guess, feedback code).
+
+    :raises ValueError: if a field is malformed.
+    """
+    known = query.get("known") or "....."
+    if len(known) != 5:
+        raise ValueError(f"Invalid known pattern {known!r}, expected 5 characters")
+    known_pattern = [None if ch in ".?_ " else _check_letter(ch.lower()) for ch in known]
+
+    unknowns = []
+    for item in query.get("misplaced") or []:
+        pos, letter = (item[0], item[1:]) if isinstance(item, str) else item
+        pos = int(pos)
+        if not 0 <= pos < 5:
+            raise ValueError(f"Invalid position {pos} in misplaced, expected 0-4")
+        unknowns.append((pos, _check_letter(letter.lower())))
+
+    excluded_letters = [_check_letter(ch.lower()) for ch in query.get("excluded") or []]
+
+    history = []
+    for item in query.get("history") or []:
+        guess, feedback = item.split(":", 1) if isinstance(item, str) else item
+        history.append(parse_turn(guess, feedback))
+    return (known_pattern, unknowns, excluded_letters), history
+
+
+class QueryRunner:
+    def __init__(self, corpus, strategy="frequency", top_n=20, engine="index", workers=1, book=None):
+        """
+        Answer solver queries without the GUI; the corpus and index are built once.
+
+        Candidates are ranked like the GUI does: by letter frequency over the
+        candidates themselves, or with a bucket-based strategy over the whole
+        dictionary, in which case the FeedbackMatrix is loaded on first use.
+
+        Parameters:
+            corpus (WordCorpus): The dictionary.
+            strategy (str): Default scorer name from SCORERS.
+            top_n (int): Default number of ranked candidates to return.
+            engine (str): Filtering engine, one of ENGINES.
+            workers (int | None): Processes for bucket-based ranking (see
+                BucketCounter); call close() to stop them.
+            book (str, optional): OpeningBook file for the default strategy.
+                Queries that only give a history the book covers are answered
+                from it instead of ranking the dictionary.
+
+        :raises ValueError: if a book is given for a strategy that does not use buckets.
+        """
+        if book is not None and not SCORERS[strategy].needs_buckets:
+            raise ValueError(f"An opening book needs a bucket-based strategy, not {strategy!r}")
+        self.corpus = corpus
+        self.strategy = strategy
+        self.top_n = top_n
+        self.workers = workers
+        self.book_path = book
+        self.book = None
+        self.solver = WordleSolver(corpus, engine=engine, verbose=False)
+        self.analyzer = CandidateFrequencyAnalyzer(corpus)
+        self.ranker = GuessRanker(corpus, analyzer=self.analyzer)
+        # History prefix -> ids of the words consistent with it
+        self.histories = LRUCache(4096)
+
+    def history_ids(self, history):
+        """
+        Return the ids of the words consistent with every played turn.
+
+        The first turn is answered by the index over the whole dictionary;
+        each later turn only filters the survivors of the turns before it.
+        Every prefix is cached, so states that share turns (typically the
+        opener) share that work.
+
+        Parameters:
+            history (Sequence[tuple[str, int]]): (guess, feedback code) of every turn.
+
+        Returns:
+            numpy.ndarray: Word ids, in ascending order.
+        """
+        history = tuple(history)
+        if not history:
+            return np.arange(len(self.corpus))
+        ids = self.histories.get(history)
+        if ids is None:
+            if len(history) == 1:
+                ids = np.arange(len(self.corpus))
+            else:
+                ids = self.history_ids(history[:-1])
+            ids = self.filter_turn(ids, *history[-1])
+            self.histories.put(history, ids)
+        return ids
+
+    def filter_turn(self, ids, guess, code):
+        """
+        Keep the ids of the words that give exactly this feedback to the guess.
+
+        Uses the FeedbackMatrix row when the matrix is loaded and the guess is
+        a dictionary word. Otherwise the whole dictionary goes through the
+        index and a short list through per-word clue checks. Both are exact
+        for a guess with distinct letters. A repeated letter needs its count
+        checked, so the survivors' feedback is computed. Longer lists have
+        their feedback computed directly.
+
+        Parameters:
+            ids (numpy.ndarray): Ascending word ids to filter.
+            guess (str): The guess played.
+            code (int): Its feedback code.
+
+        Returns:
+            numpy.ndarray: The matching ids, in ascending order.
+        """
+        matrix = self.ranker.matrix
+        guess_id = self.corpus.word_ids.get(guess)
+        if matrix is not None and guess_id is not None:
+            return ids[matrix.patterns[guess_id, ids] == code]
+
+        if len(ids) == len(self.corpus):
+            ids = np.asarray(self.solver.match(Constraints.from_history([(guess, code)])), dtype=np.intp)
+        elif len(ids) > 256:
+            # Cheaper to compute the feedback of every survivor than to check them one by one
+            return ids[FeedbackMatrix.compute(encode_words([guess]), self.corpus.letters[ids])[0] == code]
+        else:
+            constraints = Constraints.from_history([(guess, code)])
+            ids = np.asarray(constraints.filter_ids(self.solver.words, self.solver.masks, ids.tolist()), dtype=np.intp)
+        if len(set(guess)) < 5 and len(ids):
+            ids = ids[FeedbackMatrix.compute(encode_words([guess]), self.corpus.letters[ids])[0] == code]
+        return ids
+
+    def resolve_histories(self, histories):
+        """
+        Work out the candidate ids of many histories together, level by level.
+
+        Histories are grouped by the turns they share. For every group of
+        prefixes with the same parent, the feedback of all their distinct
+        next guesses against the parent's survivors comes from one
+        vectorized FeedbackMatrix.compute call (or one slice of the loaded
+        matrix), rather than one call per history.
+
+        Parameters:
+            histories (Iterable[tuple]): Histories as tuples of (guess, feedback code).
+
+        Returns:
+            dict[tuple, numpy.ndarray]: Ascending word ids of every history and prefix.
+        """
+        resolved = {(): np.arange(len(self.corpus))}
+        children = {}
+        for history in histories:
+            for k in range(1, len(history) + 1):
+                children.setdefault(history[: k - 1], set()).add(history[:k])
+
+        level = [()]
+        while level:
+            next_level = []
+            for parent in level:
+                pending = []
+                for prefix in children.get(parent, ()):
+                    ids = self.histories.get(prefix)
+                    if ids is None:
+                        pending.append(prefix)
+                    else:
+                        resolved[prefix] = ids
+                    next_level.append(prefix)
+
+                guesses = sorted({prefix[-1][0] for prefix in pending})
+                if len(guesses) == 1 or not parent:
+                    # A single guess (or the whole dictionary) is cheaper one turn at a time
+                    for prefix in pending:
+                        resolved[prefix] = self.filter_turn(resolved[parent], *prefix[-1])
+                else:
+                    parent_ids = resolved[parent]
+                    patterns = self.turn_patterns(guesses, parent_ids)
+                    rows = {guess: row for row, guess in enumerate(guesses)}
+                    for prefix in pending:
+                        guess, code = prefix[-1]
+                        resolved[prefix] = parent_ids[patterns[rows[guess]] == code]
+                for prefix in pending:
+                    self.histories.put(prefix, resolved[prefix])
+            level = next_level
+        return resolved
+
+    def turn_patterns(self, guesses, ids):
+        """
+        Feedback of each guess against each of the given words.
+
+        Returns:
+            numpy.ndarray: (len(guesses), len(ids)) uint8 pattern codes.
+        """
+        matrix = self.ranker.matrix
+        if matrix is not None:
+            guess_ids = [self.corpus.word_ids.get(guess) for guess in guesses]
+            if None not in guess_ids:
+                return matrix.patterns[np.ix_(guess_ids, ids)]
+        return FeedbackMatrix.compute(encode_words(guesses), self.corpus.letters[ids])
+
+    def candidate_ids(self, clues, history):
+        """Return the ids of the words matching the clues and the played turns."""
+        solver = self.solver
+        constraints = Constraints.from_clues(*clues)
+        if not history:
+            return list(solver.match(constraints))
+
+        ids = self.history_ids(history).tolist()
+        known_pattern, unknowns, excluded_letters = clues
+        if any(known_pattern) or unknowns or excluded_letters:
+            ids = constraints.filter_ids(solver.words, solver.masks, ids)
+        return ids
+
+    def rank_ids(self, ids, strategy, top_n):
+        """
+        Rank guesses for the given candidate ids the way the GUI does.
+
+        Frequency-style strategies rank the candidates themselves by letter
+        frequency over the candidates. Bucket-based ones rank the whole
+        dictionary and load the FeedbackMatrix on first use.
+
+        Returns:
+            list[tuple[str, float]]: List of (word, score), best first.
+        """
+        ids = np.asarray(ids, dtype=np.intp)
+        if SCORERS[strategy].needs_buckets:
+            self.load_matrix()
+            guess_ids = np.arange(len(self.corpus))
+        else:
+            self.analyzer.update(ids)
+            guess_ids = ids
+        return self.ranker.rank(RankingQuery(self.ranker, ids, guess_ids), strategy, top_n)
+
+    def book_guess(self, clues, history, ids, strategy):
+        """
+        Look the next guess up in the opening book, if one is configured.
+
+        Only queries in the runner's own strategy that give nothing but a
+        history are answered from the book; clues may rule out words the
+        book still counts on.
+
+        Returns:
+            list[tuple[str, float]] | None: The book's guess with its score, or
+            None if the query has to be searched.
+        """
+        known_pattern, unknowns, excluded_letters = clues
+        if self.book_path is None or strategy != self.strategy or not len(ids):
+            return None
+        if any(known_pattern) or unknowns or excluded_letters:
+            return None
+        guess = self.load_book().next_guess(history)
+        if guess is None:
+            return None
+        query = RankingQuery(self.ranker, np.asarray(ids, dtype=np.intp), np.array([self.ranker.word_ids[guess]]))
+        return self.ranker.rank(query, strategy, top_n=1)
+
+    def solve_batch(self, states, top_n=0, strategy=None):
+        """
+        Solve many independent board states in one call.
+
+        Identical states are solved once, and history prefixes shared between
+        states reuse one cached candidate set (see history_ids), so a batch
+        built from common openers costs little more than its distinct
+        positions.
+
+        Parameters:
+            states (Iterable): Each state is a Constraints, or a history as a
+                sequence of (guess, feedback) pairs checked by parse_turn.
+            top_n (int): Ranked guesses per state; 0 skips ranking.
+            strategy (str, optional): Scorer name; the runner's default if None.
+
+        Returns:
+            BatchResult: counts ((B,) int64 array), ids (list of ascending id
+            arrays; identical states share one array) and rankings (list of
+            (word, score) lists, or None when top_n is 0).
+
+        :raises ValueError: if a state or the strategy is invalid.
+        """
+        strategy = strategy or self.strategy
+        if strategy not in SCORERS:
+            raise ValueError(f"Unknown strategy {strategy!r}, expected one of {', '.join(SCORERS)}")
+
+        keys = [state if isinstance(state, Constraints) else self._history_key(state) for state in states]
+        resolved = self.resolve_histories(key for key in keys if not isinstance(key, Constraints))
+
+        solved = {}
+        ids_list = []
+        rankings = []
+        for key in keys:
+            entry = solved.get(key)
+            if entry is None:
+                if isinstance(key, Constraints):
+                    ids = np.asarray(self.solver.match(key), dtype=np.intp)
+                else:
+                    ids = resolved[key]
+                entry = solved[key] = (ids, self.rank_ids(ids, strategy, top_n) if top_n else None)
+            ids_list.append(entry[0])
+            rankings.append(entry[1])
+
+        counts = np.array([len(ids) for ids in ids_list], dtype=np.int64)
+        return BatchResult(counts, ids_list, rankings if top_n else None)
+
+    def solve(self, query):
+        """
+        Answer one query (see parse_query for its fields).
+
+        The optional "id" is echoed back, and "strategy" and "top" override the
+        defaults for this query.
+
+        Returns:
+            dict: {"id", "count", "candidates": [[word, score], ...]}, or
+            {"id", "error"} if the query is invalid.
+        """
+        result = {"id": query.get("id")} if isinstance(query, dict) else {"id": None}
+        try:
+            if not isinstance(query, dict):
+                raise ValueError("Query must be a JSON object")
+            clues, history = parse_query(query)
+            strategy = query.get("strategy") or self.strategy
+            top_n = query.get("top") or self.top_n
+            if isinstance(top_n, bool) or not isinstance(top_n, int) or top_n < 0:
+                raise ValueError(f"Invalid top {top_n!r}, expected a positive integer")
+            if strategy not in SCORERS:
+                raise ValueError(f"Unknown strategy {strategy!r}, expected one of {', '.join(SCORERS)}")
+
+            ids = self.candidate_ids(clues, history)
+            ranked = self.book_guess(clues, history, ids, strategy)
+            if ranked is None:
+                ranked = self.rank_ids(ids, strategy, top_n)
+        except (ValueError, TypeError, IndexError, AttributeError) as e:
+            result["error"] = str(e)
+            return result
+
+        result["count"] = len(ids)
+        result["candidates"] = [[word, score] for word, score in ranked]
+        return result
+
+    @staticmethod
+    def _history_key(history):
+        return tuple(parse_turn(guess, feedback) for guess, feedback in history)
+
+    def load_matrix(self):
+        """
+        Load the FeedbackMatrix next to the dictionary now, building it if
+        needed, rather than on the first bucket-based query.
+
+        Returns:
+            FeedbackMatrix: The matrix used by the ranker.
+        """
+        if self.ranker.matrix is None:
+            save_dir = os.path.dirname(self.corpus.path or "") or "dict"
+            matrix = FeedbackMatrix.load(self.corpus, save_dir)
+            self.ranker = GuessRanker(self.corpus, analyzer=self.analyzer, matrix=matrix, workers=self.workers)
+        return self.ranker.matrix
+
+    def load_book(self):
+        """
+        Load the opening book now, building it (and the FeedbackMatrix) if
+        needed, rather than on the first query it answers.
+
+        Returns:
+            OpeningBook: The book for the runner's strategy.
+        """
+        if self.book is None:
+            self.load_matrix()
+            self.book = OpeningBook.load(self.ranker, self.book_path, self.strategy, workers=self.workers)
+        return self.book
+
+    def close(self):
+        """Shut down the ranking worker processes, if any were started."""
+        self.ranker.close()
+
+
+DICT_URL = "https://github.com/TitanComputer/wordle-list/raw/refs/heads/main/words"
+
+
+def prepare(patterns=False, book=False, compress=False, url=DICT_URL, force=False, workers=1):
+    """
+    Download and filter the dictionary, then optionally precompute the patterns
+    and opening book; the book is built with `workers` processes (see BucketCounter).
+    """
+    downloader = DictionaryDownloader(url)
+    downloader.download(force=force)
     wf = WordFilter()
     wf.filter_and_save()
     analyzer = LetterFrequencyAnalyzer()
     analyzer.analyze()
 
-    # top_words = analyzer.suggest_best_words()
-    # for word, score in top_words:
-    #     print(f"{word}: {score:.2f}")
+    if patterns or book:
+        corpus = WordCorpus.load(wf.output_path)
+        matrix = FeedbackMatrix.load(corpus, compress=compress)
+        if book:
+            ranker = GuessRanker(corpus, matrix=matrix, workers=workers)
+            try:
+                OpeningBook.load(ranker)
+            finally:
+                ranker.close()
+
+
+def main(argv=None):
+    """
+    Command line entry point, also run by `python -m solver`.
+
+    Subcommands:
+        prepare: download and filter the dictionary (the default).
+        solve: answer one query given as options.
+        batch: answer JSON-lines queries from stdin, one JSON line out per query.
+
+    Only results go to stdout; progress messages go to stderr.
+    """
+    import json
+    import argparse
 
-    # custom_words = ["crane", "slate", "ghost"]
-    # top_custom = analyzer.suggest_best_words(word_list=custom_words, top_n=3)
-    # for word, score in top_custom:
-    #     print(f"{word}: {score:.2f}")
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or argv[0].startswith("-") and argv[0] not in ("-h", "--help"):
+        # `python solver.py [--patterns ...]` keeps meaning prepare
+        argv = ["prepare"] + argv
+
+    parser = argparse.ArgumentParser(prog="python -m solver", description="Wordle solver without the GUI.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    prep = commands.add_parser("prepare", help="download and filter the dictionary")
+    prep.add_argument("--patterns", action="store_true", help="also precompute the feedback matrix")
+    prep.add_argument("--book", action="store_true", help="also precompute the opening book")
+    prep.add_argument("--compress", action="store_true", help="store the feedback matrix zstd-compressed")
+    prep.add_argument("--url", default=DICT_URL, help="dictionary to download")
+    prep.add_argument("--force", action="store_true", help="download even if the saved dictionary is up to date")
+    prep.add_argument("--workers", type=int, default=1, help="processes for building the book (0 = every core)")
+
+    solve = commands.add_parser("solve", help="answer one query given as options")
+    solve.add_argument("--known", help='green letters, e.g. "s.a.."')
+    solve.add_argument("--misplaced", nargs="+", default=[], metavar="POSLETTER", help='yellow clues, e.g. 0r 4t')
+    solve.add_argument("--excluded", default="", help='gray letters, e.g. "ceiou"')
+    solve.add_argument("--history", nargs="+", default=[], metavar="GUESS:FEEDBACK", help="e.g. crane:bybbg")
+
+    batch = commands.add_parser("batch", help="answer JSON-lines queries from stdin")
+
+    for sub in (solve, batch):
+        sub.add_argument("--dict", default="dict/words_filtered.txt", help="filtered dictionary file")
+        sub.add_argument("--strategy", default="frequency", choices=sorted(SCORERS), help="ranking strategy")
+        sub.add_argument("--top", type=int, default=20, help="number of ranked candidates to return")
+        sub.add_argument("--engine", default="index", choices=sorted(ENGINES), help="filtering engine")
+        sub.add_argument("--workers", type=int, default=1, help="processes for bucket-based ranking (0 = every core)")
+        sub.add_argument("--book", action="store_true", help="answer history-only queries from the opening book")
+    args = parser.parse_args(argv)
+
+    if args.command == "prepare":
+        prepare(args.patterns, args.book, args.compress, args.url, args.force, args.workers)
+        return 0
+
+    if not os.path.exists(args.dict):
+        print(f"File {args.dict} not found! Run `python -m solver prepare` first.", file=sys.stderr)
+        return 1
+    book = os.path.join(os.path.dirname(args.dict), "book.pkl") if args.book else None
+    if book is not None and not SCORERS[args.strategy].needs_buckets:
+        print(f"--book needs a bucket-based --strategy, not {args.strategy}.", file=sys.stderr)
+        return 1
+    # Keep stdout for results; loading messages go to stderr
+    with contextlib.redirect_stdout(sys.stderr):
+        runner = QueryRunner(WordCorpus.load(args.dict), args.strategy, args.top, args.engine, args.workers, book)
+    try:
+        return _run_queries(args, runner)
+    finally:
+        runner.close()
+
+
+def _run_queries(args, runner):
+    """Answer the solve or batch subcommand's queries with runner."""
+    import json
+
+    def answer(query):
+        with contextlib.redirect_stdout(sys.stderr):
+            result = runner.solve(query)
+        return json.dumps(result, separators=(",", ":"))
+
+    if args.command == "solve":
+        query = {"known": args.known, "misplaced": args.misplaced, "excluded": args.excluded, "history": args.history}
+        print(answer(query))
+        return 0
+
+    out = sys.stdout
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            query = json.loads(line)
+        except json.JSONDecodeError as e:
+            out.write(json.dumps({"id": None, "error": f"Invalid JSON: {e}"}, separators=(",", ":")) + "\n")
+        else:
+            out.write(answer(query) + "\n")
+        # Flush per line so a caller can wait for each answer
+        out.flush()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+import os
+import sys
+import time
+import builtins
+import contextlib
+
+# Set WORDLE_SOLVER_STARTUP=1 (or pass --startup-report) to print the report
+ENABLED = os.environ.get("WORDLE_SOLVER_STARTUP") == "1" or "--startup-report" in sys.argv
+
+# Seconds from process start; a milestone over budget is flagged in the report
+BUDGETS = {"first window": 1.0, "first query": 1.5}
+
+# Imports slower than this (cumulative seconds) are listed in the report
+MIN_IMPORT_SECONDS = 0.002
+
+
+class StartupTimer:
+    def __init__(self):
+        """
+        Records where start-up time goes, like `python -X importtime` but built in.
+
+        Three kinds of entries are kept:
+            imports: (name, self seconds, cumulative seconds, depth) for every
+                module imported while the hook is installed.
+            phases: (name, seconds) for code wrapped in phase().
+            milestones: (name, seconds since start) recorded by mark().
+        """
+        self.start = time.perf_counter()
+        self.imports = []
+        self.phases = []
+        self.milestones = {}
+        self._original_import = None
+        # Time spent in nested imports, one slot per import in progress
+        self._children = []
+
+    def install(self):
+        """Start timing imports by wrapping builtins.__import__."""
+        if self._original_import is None:
+            self._original_import = builtins.__import__
+            builtins.__import__ = self._timed_import
+
+    def uninstall(self):
+        """Restore the original builtins.__import__."""
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level == 0 and name in sys.modules and not fromlist:
+            # Already imported: nothing to time
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        label = name
+        if level:
+            # Relative import: report the absolute module name
+            package = (globals or {}).get("__package__") or ""
+            base = package.rsplit(".", level - 1)[0] if level > 1 else package
+            label = f"{base}.{name}" if name else base
+
+        self._children.append(0.0)
+        start = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = self._children.pop()
+            if self._children:
+                self._children[-1] += elapsed
+            # Re-imports of loaded modules cost microseconds; skip the noise
+            if elapsed - children > 1e-5 or children:
+                self.imports.append((label, elapsed - children, elapsed, len(self._children)))
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """Time the wrapped block as a named start-up phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    def mark(self, name):
+        """
+        Record a milestone (time since start) the first time it is reached.
+
+        Returns:
+            bool: True if this call recorded it.
+        """
+        if name in self.milestones:
+            return False
+        self.milestones[name] = time.perf_counter() - self.start
+        return True
+
+    def report(self, top_n=15):
+        """
+        Build the report text.
+
+        Imports are listed slowest first by cumulative time, with their own
+        (self) time next to it, so the heavy dependency behind a slow import
+        is easy to spot.
+        """
+        lines = ["", "Start-up report"]
+        slow = sorted(
+            (i for i in self.imports if i[2] >= MIN_IMPORT_SECONDS), key=lambda i: i[2], reverse=True
+        )[:top_n]
+        if slow:
+            lines.append(f"  {'import':<40}{'self ms':>10}{'cumul ms':>10}")
+            for name, own, cumulative, depth in slow:
+                label = "  " * min(depth, 4) + name
+                lines.append(f"  {label:<40}{own * 1e3:>10.1f}{cumulative * 1e3:>10.1f}")
+        if self.phases:
+            lines.append(f"  {'phase':<40}{'ms':>10}")
+            for name, seconds in self.phases:
+                lines.append(f"  {name:<40}{seconds * 1e3:>10.1f}")
+        if self.milestones:
+            lines.append(f"  {'milestone':<40}{'ms':>10}{'budget':>10}")
+            for name, seconds in self.milestones.items():
+                budget = BUDGETS.get(name)
+                if budget is None:
+                    lines.append(f"  {name:<40}{seconds * 1e3:>10.1f}")
+                else:
+                    flag = "  OVER BUDGET" if seconds > budget else ""
+                    lines.append(f"  {name:<40}{seconds * 1e3:>10.1f}{budget * 1e3:>10.0f}{flag}")
+        return "\n".join(lines)
+
+
+timer = StartupTimer()
+if ENABLED:
+    timer.install()
+
+
+def phase(name):
+    """Time a start-up phase; see StartupTimer.phase."""
+    return timer.phase(name)
+
+
+def mark(name, report=False):
+    """
+    Record a milestone and, if enabled and asked to, print the report.
+
+    Parameters:
+        name (str): Milestone name, e.g. "first window".
+        report (bool): Print the report after recording.
+    """
+    if timer.mark(name) and ENABLED and report:
+        print(timer.report())
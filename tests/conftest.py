@@ -0,0 +1,13 @@
+import os
+
+import pytest
+
+from solver import WordCorpus
+
+DICT_PATH = os.path.join(os.path.dirname(__file__), os.pardir, "dict", "words_filtered.txt")
+
+
+@pytest.fixture(scope="session")
+def corpus():
+    """The bundled filtered dictionary."""
+    return WordCorpus.load(DICT_PATH)
@@ -0,0 +1,64 @@
+import random
+
+import numpy as np
+import pytest
+
+from solver import Constraints, QueryRunner, feedback_pattern, parse_query
+from tests.test_engines import reference_filter
+
+
+@pytest.fixture(scope="module")
+def runner(corpus):
+    return QueryRunner(corpus)
+
+
+def test_solve_batch_matches_brute_force(corpus, runner):
+    words = corpus.words
+    rng = random.Random(4)
+    states = []
+    for _ in range(200):
+        answer = rng.choice(words)
+        history = []
+        for _ in range(rng.randint(0, 3)):
+            guess = rng.choice(["eerie", "geese", "llama", "sassy", rng.choice(words)])
+            history.append((guess, feedback_pattern(guess, answer)))
+        states.append(history)
+
+    rows = {}
+    for history in states:
+        for guess, _ in history:
+            if guess not in rows:
+                rows[guess] = [feedback_pattern(guess, w) for w in words]
+
+    result = runner.solve_batch(states, top_n=3)
+    for history, ids, count in zip(states, result.ids, result.counts):
+        expected = [i for i in range(len(words)) if all(rows[g][i] == code for g, code in history)]
+        assert ids.tolist() == expected, history
+        assert count == len(expected)
+
+
+def test_solve_batch_accepts_constraints(corpus, runner):
+    clues = (["s", None, "a", None, None], [(0, "r")], list("ceiou"))
+    result = runner.solve_batch([Constraints.from_clues(*clues)], top_n=2)
+    expected = reference_filter(corpus.words, *clues)
+    assert [corpus.words[i] for i in result.ids[0]] == expected
+    assert len(result.rankings[0]) == min(2, len(expected))
+
+
+def test_solve_batch_accepts_marks_and_numpy_codes(runner):
+    code = feedback_pattern("crane", "slate")
+    by_marks = runner.solve_batch([[("CRANE", "bbgbg")]])
+    by_code = runner.solve_batch([[("crane", np.uint8(code))]])
+    assert parse_query({"history": [["crane", "bbgbg"]]})[1] == [("crane", code)]
+    assert by_marks.ids[0].tolist() == by_code.ids[0].tolist()
+
+
+@pytest.mark.parametrize(
+    "turn",
+    [("crane", 99999), ("crane", 243), ("crane", -5), ("crane", True), ("crane", 1.0), ("crane", "gyb"), ("cr4ne", 0)],
+)
+def test_solve_batch_rejects_invalid_turns(runner, turn):
+    with pytest.raises(ValueError):
+        runner.solve_batch([[turn]])
+    with pytest.raises(ValueError):
+        parse_query({"history": [list(turn)]})
@@ -0,0 +1,39 @@
+import pytest
+
+from solver import OpeningBook, QueryRunner, WordCorpus, feedback_pattern
+
+
+@pytest.fixture(scope="module")
+def runner(corpus, tmp_path_factory):
+    """An entropy runner over 600 words, with its matrix and book in a temporary directory."""
+    save_dir = tmp_path_factory.mktemp("book")
+    words = WordCorpus(corpus.words[::25], path=str(save_dir / "words.txt"))
+    runner = QueryRunner(words, strategy="entropy", book=str(save_dir / "book.pkl"))
+    yield runner
+    runner.close()
+
+
+def test_history_only_queries_follow_the_book(runner):
+    book = runner.load_book()
+    assert isinstance(book, OpeningBook)
+    result = runner.solve({})
+    assert result["count"] == len(runner.corpus)
+    assert [word for word, _ in result["candidates"]] == [book.opener]
+
+    answer = runner.corpus.words[7]
+    history = [[book.opener, feedback_pattern(book.opener, answer)]]
+    result = runner.solve({"history": history})
+    assert [word for word, _ in result["candidates"]] == [book.next_guess([tuple(history[0])])]
+
+
+def test_queries_the_book_does_not_cover_are_searched(runner):
+    opener = runner.load_book().opener
+    off_book = next(word for word in runner.corpus.words if word != opener)
+    for query in ({"known": "....e"}, {"history": [[off_book, "bbbbb"]]}, {"strategy": "minimax"}):
+        result = runner.solve(dict(query, top=5))
+        assert len(result["candidates"]) == min(5, result["count"]), query
+
+
+def test_book_needs_a_bucket_strategy(corpus):
+    with pytest.raises(ValueError):
+        QueryRunner(corpus, strategy="frequency", book="book.pkl")
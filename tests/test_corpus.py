@@ -0,0 +1,105 @@
+import os
+
+import numpy as np
+import pytest
+import zstandard
+
+from solver import FeedbackMatrix, GuessRanker, OpeningBook, WordCorpus, open_compressed, train_zstd_dict
+from tests.conftest import DICT_PATH
+
+WORDS = ["crane", "slate", "bobby", "zesty", "aahed", "mamma"]
+
+
+def write_words(path, words):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(words) + "\n")
+    return str(path)
+
+
+def assert_same_corpus(loaded, expected):
+    assert loaded.words == expected.words
+    assert loaded.version == expected.version
+    np.testing.assert_array_equal(loaded.letters, expected.letters)
+    np.testing.assert_array_equal(loaded.mask_array, expected.mask_array)
+
+
+def test_binary_round_trip(tmp_path):
+    corpus = WordCorpus(sorted(WORDS))
+    path = str(tmp_path / "words.bin")
+    corpus.save_binary(path)
+    loaded = WordCorpus.load(path)
+    assert_same_corpus(loaded, corpus)
+    assert loaded.source == (0, 0)
+
+
+def test_text_file_uses_its_binary_sibling(tmp_path):
+    text = write_words(tmp_path / "words.txt", sorted(WORDS))
+    binary = str(tmp_path / "words.bin")
+    WordCorpus(sorted(WORDS)).save_binary(binary, source=text)
+    loaded = WordCorpus.load(text)
+    assert loaded.path == binary
+    assert_same_corpus(loaded, WordCorpus(sorted(WORDS)))
+
+
+def test_stale_binary_sibling_is_ignored(tmp_path):
+    text = write_words(tmp_path / "words.txt", sorted(WORDS))
+    WordCorpus(sorted(WORDS)).save_binary(str(tmp_path / "words.bin"), source=text)
+
+    # An older copy of the list put back in place of the text file
+    write_words(tmp_path / "words.txt", sorted(WORDS[:3]))
+    stale = WordCorpus.load(text)
+    assert stale.path == text
+    assert stale.words == tuple(sorted(WORDS[:3]))
+
+    # Same size, but a different mtime than the one recorded
+    write_words(tmp_path / "words.txt", sorted(WORDS))
+    WordCorpus(sorted(WORDS)).save_binary(str(tmp_path / "words.bin"), source=text)
+    os.utime(text, ns=(1, 1))
+    assert WordCorpus.load(text).path == text
+
+
+def test_binary_sibling_without_source_is_ignored(tmp_path):
+    text = write_words(tmp_path / "words.txt", sorted(WORDS))
+    WordCorpus(sorted(WORDS[:2])).save_binary(str(tmp_path / "words.bin"))
+    assert WordCorpus.load(text).words == tuple(sorted(WORDS))
+
+
+def test_malformed_binary(tmp_path):
+    path = tmp_path / "words.bin"
+    path.write_bytes(b"not a dictionary" * 4)
+    with pytest.raises(ValueError):
+        WordCorpus.load(str(path))
+    # A broken sibling falls back to the text file
+    text = write_words(tmp_path / "words.txt", sorted(WORDS))
+    assert WordCorpus.load(text).words == tuple(sorted(WORDS))
+
+
+@pytest.fixture(scope="module")
+def zstd_dict():
+    return train_zstd_dict([DICT_PATH], dict_size=4096, sample_size=1024)
+
+
+def test_zst_round_trips_with_trained_dict(tmp_path, corpus, zstd_dict):
+    words = WordCorpus(corpus.words[::7])
+    text = str(tmp_path / "words.txt.zst")
+    with open_compressed(text, "wt", zstd_dict=zstd_dict) as f:
+        f.write("\n".join(words.words) + "\n")
+    assert_same_corpus(WordCorpus.load(text, zstd_dict=zstd_dict), words)
+
+    binary = str(tmp_path / "words.bin.zst")
+    words.save_binary(binary, zstd_dict=zstd_dict)
+    assert_same_corpus(WordCorpus.load(binary, zstd_dict=zstd_dict), words)
+    # Frames written with a dictionary cannot be read without it
+    with pytest.raises(zstandard.ZstdError):
+        WordCorpus.load_binary(binary)
+
+
+def test_zst_book_round_trip(tmp_path, corpus, zstd_dict):
+    words = WordCorpus(corpus.words[::50])
+    ranker = GuessRanker(words, matrix=FeedbackMatrix.load(words, str(tmp_path), compress=True, zstd_dict=zstd_dict))
+    path = str(tmp_path / "book.pkl.zst")
+    book = OpeningBook.build(ranker)
+    book.save(path, zstd_dict)
+    loaded = OpeningBook.load(ranker, path, zstd_dict=zstd_dict)
+    assert loaded.moves == book.moves
+    assert loaded.opener == book.opener
@@ -0,0 +1,112 @@
+import os
+import threading
+import http.server
+
+import pytest
+
+from solver import DictionaryDownloader, open_compressed
+
+BODY = b"".join(f"w{i:04d}\n".encode() for i in range(20000))
+
+
+class StandInHandler(http.server.BaseHTTPRequestHandler):
+    """Serves BODY with an ETag, honouring If-None-Match and Range / If-Range."""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(dict(self.headers))
+        if self.headers.get("If-None-Match") == server.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        start = 0
+        requested = self.headers.get("Range", "")
+        if requested.startswith("bytes=") and self.headers.get("If-Range") == server.etag:
+            start = int(requested[6:].rstrip("-"))
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(BODY) - 1}/{len(BODY)}")
+        else:
+            self.send_response(200)
+        self.send_header("ETag", server.etag)
+        self.send_header("Content-Length", str(len(BODY) - start))
+        self.end_headers()
+
+        data = BODY[start:]
+        if server.cut_after is not None:
+            # Drop the connection part way through the body
+            data, server.cut_after = data[: server.cut_after], None
+            self.close_connection = True
+        self.wfile.write(data)
+
+
+@pytest.fixture
+def server():
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    httpd.etag = '"v1"'
+    httpd.cut_after = None
+    httpd.requests = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    httpd.url = f"http://127.0.0.1:{httpd.server_port}/words"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def read(path):
+    with open_compressed(path, "rb") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_download_then_not_modified_then_changed(server, tmp_path, compress):
+    downloader = DictionaryDownloader(server.url, save_dir=str(tmp_path), compress=compress, timeout=5)
+    assert downloader.download() == "downloaded"
+    assert read(downloader.save_path) == BODY
+
+    assert downloader.download() == "unchanged"
+    assert server.requests[-1]["If-None-Match"] == '"v1"'
+
+    server.etag = '"v2"'
+    assert downloader.download() == "downloaded"
+    assert downloader.download(force=True) == "downloaded"
+    assert "If-None-Match" not in server.requests[-1]
+    assert not os.path.exists(downloader.part_path)
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_interrupted_download_resumes_with_range(server, tmp_path, compress):
+    downloader = DictionaryDownloader(
+        server.url, save_dir=str(tmp_path), compress=compress, timeout=5, chunk_size=4096
+    )
+    server.cut_after = 50000
+    assert downloader.download() == "failed"
+    assert not os.path.exists(downloader.save_path)
+    offset = os.path.getsize(downloader.part_path)
+    assert 0 < offset <= 50000
+
+    assert downloader.download() == "downloaded"
+    assert server.requests[-1]["Range"] == f"bytes={offset}-"
+    assert read(downloader.save_path) == BODY
+    assert not os.path.exists(downloader.part_path)
+
+
+def test_resume_restarts_when_the_file_changed(server, tmp_path):
+    downloader = DictionaryDownloader(server.url, save_dir=str(tmp_path), timeout=5, chunk_size=4096)
+    server.cut_after = 50000
+    assert downloader.download() == "failed"
+
+    # If-Range no longer matches, so the server sends the whole new version
+    server.etag = '"v2"'
+    assert downloader.download() == "downloaded"
+    assert read(downloader.save_path) == BODY
+
+
+def test_unreachable_server_fails_cleanly(tmp_path):
+    downloader = DictionaryDownloader("http://127.0.0.1:9/words", save_dir=str(tmp_path), timeout=2)
+    assert downloader.download() == "failed"
+    assert not os.path.exists(downloader.save_path)
@@ -0,0 +1,35 @@
+import re
+import random
+
+from solver import ENGINES, LRUCache, WordleSolver
+
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+
+def reference_filter(words, known_pattern, unknowns, excluded_letters):
+    """The original list-comprehension filter that every engine must agree with."""
+    regex = re.compile("".join(ch if ch else "." for ch in known_pattern))
+    candidates = [w for w in words if regex.match(w)]
+    for idx, letter in unknowns:
+        candidates = [w for w in candidates if letter in w and w[idx] != letter]
+    return [w for w in candidates if all(ch not in w for ch in excluded_letters)]
+
+
+def random_clues(rng, words):
+    """Clues drawn from a random answer, so some candidates usually survive."""
+    answer = rng.choice(words)
+    known_pattern = [answer[i] if rng.random() < 0.3 else None for i in range(5)]
+    unknowns = [(i, answer[j]) for i in range(5) for j in range(5) if rng.random() < 0.08 and answer[j] != answer[i]]
+    excluded_letters = {ch for ch in LETTERS if ch not in answer and rng.random() < 0.2}
+    return known_pattern, unknowns, excluded_letters
+
+
+def test_engines_match_reference_filter(corpus):
+    solvers = [WordleSolver(corpus, engine=engine, verbose=False, cache=LRUCache(0)) for engine in sorted(ENGINES)]
+    rng = random.Random(1)
+    for _ in range(2000):
+        clues = random_clues(rng, corpus.words)
+        expected = reference_filter(corpus.words, *clues)
+        for solver in solvers:
+            assert solver.filter_candidates(*clues) == expected, (solver.engine, clues)
+
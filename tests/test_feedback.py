@@ -0,0 +1,25 @@
+import random
+
+import numpy as np
+
+from solver import ALL_GREEN, FeedbackMatrix, encode_words, feedback_pattern
+
+# Repeated letters are where feedback rules are easiest to get wrong
+TRICKY = ["eerie", "geese", "llama", "sassy", "speed", "abbey"]
+
+
+def test_feedback_pattern_repeated_letters():
+    # g/y/b per position, as base-3 digits from position 0
+    code = lambda marks: sum("byg".index(m) * 3**i for i, m in enumerate(marks))
+    assert feedback_pattern("geese", "eerie") == code("bgybg")
+    assert feedback_pattern("speed", "abide") == code("bbyby")
+    assert feedback_pattern("crane", "crane") == ALL_GREEN
+
+
+def test_feedback_matrix_matches_feedback_pattern(corpus):
+    rng = random.Random(2)
+    guesses = rng.sample(corpus.words, 50) + TRICKY
+    answers = rng.sample(corpus.words, 500) + TRICKY
+    patterns = FeedbackMatrix.compute(encode_words(guesses), encode_words(answers), chunk_size=16)
+    expected = np.array([[feedback_pattern(g, a) for a in answers] for g in guesses], dtype=np.uint8)
+    np.testing.assert_array_equal(patterns, expected)
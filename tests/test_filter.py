@@ -0,0 +1,79 @@
+import re
+import random
+
+import pytest
+
+from solver import WordFilter
+
+# Every kind of line the filter has to get right, including separators that
+# str.splitlines() would treat as line breaks but the file format does not
+SAMPLE_LINES = [
+    "crane",
+    "  Slate\t",
+    "CRANE",
+    "bobby ",
+    "toolong",
+    "four",
+    "",
+    "ab cd",
+    "\xa0zesty\xa0",
+    "\x1cfifth\x1f",
+    "\x85nexel",
+    "\u212aayak",  # Kelvin sign, lowercases to "k"
+    "\ufeffbeach",
+    "caf\xe9s",
+    "l\xe9\x85ve",
+    "tw\x1cwo",
+]
+SEPARATORS = ["\n", "\r\n", "\r"]
+
+
+def reference_words(text):
+    """Words of the lines split on \\n, \\r\\n and \\r, accepted when strip().lower() is five letters a-z."""
+    lines = re.split(r"\r\n|\r|\n", text)
+    if lines[-1] == "":
+        lines.pop()
+    words = {line.strip().lower() for line in lines}
+    return sorted(w for w in words if re.fullmatch(r"[a-z]{5}", w)), len(lines)
+
+
+def read(tmp_path, text, chunk_size):
+    path = tmp_path / "words.txt"
+    path.write_bytes(text.encode("utf-8"))
+    found, lines = set(), 0
+    for words, count in WordFilter(str(path))._read_chunks(chunk_size):
+        found.update(word.decode("ascii") for word in words)
+        lines += count
+    return sorted(found), lines
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 7, 64, 1 << 20])
+def test_read_chunks_matches_line_semantics(tmp_path, chunk_size):
+    rng = random.Random(chunk_size)
+    for _ in range(20):
+        lines = rng.choices(SAMPLE_LINES, k=30)
+        text = "".join(line + rng.choice(SEPARATORS) for line in lines)
+        if rng.random() < 0.5:
+            # No terminator after the last line
+            text = text.rstrip("\r\n")
+        assert read(tmp_path, text, chunk_size) == reference_words(text), repr(text)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 4, 5, 6, 7])
+def test_crlf_split_across_chunks(tmp_path, chunk_size):
+    # With chunk_size 6, the first chunk ends in "\r" and the "\n" starts the next one
+    text = "crane\r\nslate\r\rbobby\r"
+    assert read(tmp_path, text, chunk_size) == (["bobby", "crane", "slate"], 4)
+
+
+def test_non_ascii_lines(tmp_path):
+    text = "\ufeffbeach\n\xa0zesty\xa0\n\u212aayak\n\x85nexel\ncaf\xe9s\n"
+    assert read(tmp_path, text, 1 << 20) == (["kayak", "nexel", "zesty"], 5)
+
+
+def test_filter_and_save_writes_sorted_unique_words(tmp_path):
+    source = tmp_path / "words.txt"
+    source.write_bytes("Slate\r\ncrane\rslate\n\xa0bobby\nno\n".encode("utf-8"))
+    output = tmp_path / "words_filtered.txt"
+    WordFilter(str(source), str(output)).filter_and_save(chunk_size=4)
+    assert output.read_text() == "bobby\ncrane\nslate\n"
@@ -0,0 +1,37 @@
+import random
+from collections import Counter
+
+import numpy as np
+
+from solver import CandidateFrequencyAnalyzer
+
+
+def recount(words, ids):
+    """Letter presence and positional counts of the given words, counted from scratch."""
+    presence = Counter(ch for i in ids for ch in set(words[i]))
+    positional = np.zeros((5, 26), dtype=np.int64)
+    for i in ids:
+        for pos, ch in enumerate(words[i]):
+            positional[pos, ord(ch) - 97] += 1
+    return presence, positional
+
+
+def test_incremental_updates_match_a_recount(corpus):
+    analyzer = CandidateFrequencyAnalyzer(corpus)
+    rng = random.Random(5)
+    for _ in range(20):
+        ids = list(range(len(corpus)))
+        analyzer.reset()
+        while ids:
+            # Mostly narrowing, as a game does, with the odd unrelated or wider set
+            roll = rng.random()
+            if roll < 0.1:
+                ids = sorted(rng.sample(range(len(corpus)), rng.randint(1, 3000)))
+            elif roll < 0.15:
+                ids = sorted(set(ids) | set(rng.sample(range(len(corpus)), 50)))
+            else:
+                ids = sorted(rng.sample(ids, int(len(ids) * rng.uniform(0.2, 0.9))))
+            analyzer.update(ids)
+            presence, positional = recount(corpus.words, ids)
+            assert analyzer.frequencies == presence
+            np.testing.assert_array_equal(analyzer.positional, positional)
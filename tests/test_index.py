@@ -0,0 +1,17 @@
+import random
+
+from solver import PositionalIndex
+
+
+def test_bitset_ids_decode_every_set_bit():
+    rng = random.Random(2)
+    for size in (0, 1, 7, 8, 9, 64, 14855):
+        bits = rng.getrandbits(size) if size else 0
+        assert PositionalIndex.ids(bits) == [i for i in range(size) if bits >> i & 1]
+
+
+def test_match_returns_ascending_ids(corpus):
+    index = PositionalIndex(corpus)
+    ids = index.match(["s", None, None, None, None], [(4, "e")], ["a"])
+    words = corpus.words
+    assert ids == [i for i, w in enumerate(words) if w[0] == "s" and "e" in w and w[4] != "e" and "a" not in w]
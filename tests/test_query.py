@@ -0,0 +1,34 @@
+import pytest
+
+from solver import ALL_GREEN, QueryRunner, parse_feedback, parse_query
+
+
+def test_parse_query_accepts_marks_and_codes():
+    clues, history = parse_query({"history": [["crane", "ggggg"], "slate:bybbg", ["sassy", 0], ["llama", 242]]})
+    assert history == [("crane", ALL_GREEN), ("slate", parse_feedback("bybbg")), ("sassy", 0), ("llama", 242)]
+    assert clues == ([None] * 5, [], [])
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        {"history": [["crane", 99999]]},
+        {"history": [["crane", 243]]},
+        {"history": [["crane", -1]]},
+        {"history": [["crane", True]]},
+        {"history": [["crane", 1.0]]},
+        {"history": [["crane", "gybx"]]},
+        {"history": [["cran", "ggggg"]]},
+        {"known": "s.a."},
+        {"misplaced": [[5, "r"]]},
+        {"excluded": ["1"]},
+    ],
+)
+def test_parse_query_rejects_invalid_fields(query):
+    with pytest.raises(ValueError):
+        parse_query(query)
+
+
+@pytest.mark.parametrize("top", [1e400, -2, "5", True])
+def test_solve_rejects_invalid_top(corpus, top):
+    assert "error" in QueryRunner(corpus).solve({"top": top})
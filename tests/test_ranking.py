@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from solver import BucketCounter, FeedbackMatrix, GuessRanker, RankingQuery, WordCorpus, bucket_counts
+
+
+@pytest.fixture(scope="module")
+def small(corpus, tmp_path_factory):
+    """A 600-word corpus with its feedback matrix memory-mapped from a file."""
+    words = WordCorpus(corpus.words[::25])
+    return words, FeedbackMatrix.load(words, str(tmp_path_factory.mktemp("matrix")))
+
+
+def test_bucket_counter_pool_matches_serial(small):
+    words, matrix = small
+    candidates = np.arange(0, len(words), 3)
+    counter = BucketCounter(matrix, workers=2, min_parallel_cells=0)
+    try:
+        np.testing.assert_array_equal(counter.counts(candidates), bucket_counts(matrix.patterns, candidates))
+        assert counter.executor is not None
+    finally:
+        counter.close()
+    assert counter.executor is None
+
+
+@pytest.mark.parametrize("strategy", ["entropy", "minimax", "expected"])
+def test_ranker_with_workers_matches_serial(small, strategy):
+    words, matrix = small
+    serial = GuessRanker(words, matrix=matrix)
+    pooled = GuessRanker(words, matrix=matrix, workers=2)
+    pooled.buckets.min_parallel_cells = 0
+    try:
+        ids = np.arange(len(words))
+        expected, result = (r.rank(RankingQuery(r, ids, ids), strategy, top_n=10) for r in (serial, pooled))
+        assert result == expected
+    finally:
+        pooled.close()
+    assert pooled.buckets.executor is None
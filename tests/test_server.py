@@ -0,0 +1,130 @@
+import os
+import json
+import asyncio
+import threading
+import http.client
+
+import pytest
+
+from server import SharedRouteTotals, SolverService
+from solver import QueryRunner
+
+
+class FailingRunner:
+    corpus = ()
+
+    def solve(self, query):
+        raise OverflowError("boom")
+
+
+def start_service(service):
+    """Serve on a free localhost port from a background event loop; returns (port, stop)."""
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    server = asyncio.run_coroutine_threadsafe(
+        asyncio.start_server(service.handle_connection, "127.0.0.1", 0), loop
+    ).result(10)
+
+    async def shutdown():
+        server.close()
+        await server.wait_closed()
+        # Keep-alive connections still waiting for a request
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stop():
+        asyncio.run_coroutine_threadsafe(shutdown(), loop).result(10)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(10)
+        loop.close()
+        service.executor.shutdown()
+
+    return server.sockets[0].getsockname()[1], stop
+
+
+@pytest.fixture(scope="module")
+def runner(corpus):
+    return QueryRunner(corpus, top_n=5)
+
+
+@pytest.fixture
+def client(runner):
+    port, stop = start_service(SolverService(runner))
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    yield connection
+    connection.close()
+    stop()
+
+
+def request(connection, method, path, payload=None):
+    body = None if payload is None else json.dumps(payload)
+    connection.request(method, path, body=body)
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+
+def test_solve_matches_runner_and_keeps_connection_alive(client, runner):
+    query = {"id": 7, "history": [["crane", "bybbg"]], "top": 3}
+    status, result = request(client, "POST", "/solve", query)
+    assert status == 200
+    assert result == json.loads(json.dumps(runner.solve(query)))
+
+    status, results = request(client, "POST", "/solve", [query, {"id": 8, "known": "s.a.."}])
+    assert status == 200
+    assert [r["id"] for r in results] == [7, 8]
+
+
+def test_invalid_requests(client):
+    assert request(client, "POST", "/solve", {"history": [["crane", 99999]]})[0] == 400
+    assert request(client, "POST", "/solve", {"top": 1e400})[0] == 400
+    assert request(client, "GET", "/solve")[0] == 405
+    assert request(client, "GET", "/nowhere")[0] == 404
+
+    client.request("POST", "/solve", body="{not json")
+    response = client.getresponse()
+    assert response.status == 400
+    response.read()
+
+
+def test_health_and_metrics(client, runner):
+    assert request(client, "GET", "/health") == (200, {"status": "ok", "words": len(runner.corpus)})
+    request(client, "POST", "/solve", {"known": "s.a.."})
+    request(client, "POST", "/solve", {"known": "s.a"})
+    status, metrics = request(client, "GET", "/metrics")
+    assert status == 200
+    assert metrics["routes"]["/solve"]["count"] == 2
+    assert metrics["routes"]["/solve"]["errors"] == 1
+
+
+def test_unexpected_error_returns_counted_500():
+    service = SolverService(FailingRunner())
+    port, stop = start_service(service)
+    try:
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        assert request(connection, "POST", "/solve", {}) == (500, {"error": "Internal error: OverflowError"})
+        assert service.stats["/solve"].errors == 1
+        connection.close()
+    finally:
+        stop()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+def test_shared_totals_add_up_across_processes():
+    totals = SharedRouteTotals(2)
+    pid = os.fork()
+    if pid == 0:
+        totals.slot = 1
+        for _ in range(3):
+            totals.record("/solve", 0.004, error=True)
+        os._exit(0)
+    totals.slot = 0
+    totals.record("/solve", 0.002)
+    totals.record("/health", 0.001)
+    os.waitpid(pid, 0)
+    summary = totals.summary()
+    assert summary["/solve"] == {"count": 4, "errors": 3, "mean_ms": pytest.approx(3.5), "max_ms": pytest.approx(4)}
+    assert summary["/health"]["count"] == 1
+    assert "/metrics" not in summary
@@ -0,0 +1,32 @@
+import random
+
+import pytest
+
+from solver import ENGINES, LRUCache, SolverSession, WordleSolver
+
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+
+@pytest.mark.parametrize("engine", sorted(ENGINES))
+def test_session_narrowing_matches_full_filter(corpus, engine):
+    solver = WordleSolver(corpus, engine=engine, verbose=False, cache=LRUCache(0))
+    session = SolverSession(solver)
+    rng = random.Random(3)
+    for _ in range(100):
+        answer = rng.choice(corpus.words)
+        known_pattern, unknowns, excluded_letters = [None] * 5, [], set()
+        for _ in range(6):
+            i, j = rng.randrange(5), rng.randrange(5)
+            roll = rng.random()
+            if roll < 0.3:
+                known_pattern[i] = answer[i]
+            elif roll < 0.6 and answer[j] != answer[i]:
+                unknowns.append((i, answer[j]))
+            elif roll >= 0.6:
+                excluded_letters |= {ch for ch in LETTERS if ch not in answer and rng.random() < 0.1}
+            # Occasionally loosen a clue, which must fall back to a full scan
+            if rng.random() < 0.1 and unknowns:
+                unknowns.pop()
+            clues = (list(known_pattern), list(unknowns), set(excluded_letters))
+            assert session.update(*clues) == solver.filter_candidates(*clues)
+        session.reset()